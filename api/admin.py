@@ -1,6 +1,37 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.template.response import TemplateResponse
 from django.utils.html import format_html
-from .models import User, Company, Customer, Interaction
+from .models import User, Company, Customer, Interaction, Job
+from .pagination import EstimatedCountPaginator
+from .services import reassign_customers
+
+
+class ReassignSalesRepForm(forms.Form):
+    sales_rep = forms.ModelChoiceField(
+        queryset=User.objects.filter(is_active=True).order_by('first_name', 'last_name', 'username'),
+        required=False,
+        empty_label='Sin representante',
+        label='Representante',
+    )
+
+
+def related_count(model, field):
+    """
+    Conteo correlacionado por fila. A diferencia de annotate(Count(...)), no
+    agrupa el join completo antes del LIMIT: solo se evalúa para la página.
+    """
+    counts = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('*'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
 
 
 @admin.register(User)
@@ -10,13 +41,19 @@ class UserAdmin(admin.ModelAdmin):
     search_fields = ['username', 'first_name', 'last_name', 'email']
     readonly_fields = ['id', 'created_at', 'updated_at']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            customer_count=related_count(Customer, 'sales_rep')
+        )
+
     def get_full_name(self, obj):
         return obj.get_full_name() or obj.username
     get_full_name.short_description = 'Nombre completo'
 
     def customer_count(self, obj):
-        return obj.customers.count()
+        return obj.customer_count
     customer_count.short_description = 'Clientes asignados'
+    customer_count.admin_order_field = 'customer_count'
 
 
 @admin.register(Company)
@@ -25,13 +62,18 @@ class CompanyAdmin(admin.ModelAdmin):
     search_fields = ['name']
     readonly_fields = ['id', 'created_at', 'updated_at']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            customer_count=related_count(Customer, 'company')
+        )
+
     def customer_count(self, obj):
-        count = obj.customers.count()
         return format_html(
             '<span style="color: #28a745; font-weight: bold;">{}</span>',
-            count
+            obj.customer_count
         )
     customer_count.short_description = 'Total clientes'
+    customer_count.admin_order_field = 'customer_count'
 
 
 @admin.register(Customer)
@@ -44,6 +86,10 @@ class CustomerAdmin(admin.ModelAdmin):
     search_fields = ['first_name', 'last_name', 'email', 'company__name']
     readonly_fields = ['id', 'created_at', 'updated_at', 'full_name', 'birthday_formatted']
     list_select_related = ['company', 'sales_rep']
+    autocomplete_fields = ['company', 'sales_rep']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['reassign_sales_rep']
 
     fieldsets = (
         ('Información Personal', {
@@ -58,6 +104,34 @@ class CustomerAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            interaction_count=related_count(Interaction, 'customer')
+        )
+
+    @admin.action(description='Reasignar representante', permissions=['change'])
+    def reassign_sales_rep(self, request, queryset):
+        """Pide el representante en una página intermedia y reasigna con un único UPDATE"""
+        if 'apply' in request.POST:
+            form = ReassignSalesRepForm(request.POST)
+            if form.is_valid():
+                result = reassign_customers(queryset, form.cleaned_data['sales_rep'])
+                self.message_user(request, f"{result['updated']} clientes reasignados.")
+                return None
+        else:
+            form = ReassignSalesRepForm()
+
+        return TemplateResponse(request, 'admin/api/customer/reassign_sales_rep.html', {
+            **self.admin_site.each_context(request),
+            'title': 'Reasignar representante',
+            'opts': self.model._meta,
+            'form': form,
+            'queryset': queryset,
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
+
     def sales_rep_name(self, obj):
         if obj.sales_rep:
             return obj.sales_rep.get_full_name() or obj.sales_rep.username
@@ -65,7 +139,7 @@ class CustomerAdmin(admin.ModelAdmin):
     sales_rep_name.short_description = 'Representante'
 
     def interaction_count(self, obj):
-        count = obj.interactions.count()
+        count = obj.interaction_count
         if count > 0:
             return format_html(
                 '<span style="color: #007bff; font-weight: bold;">{}</span>',
@@ -73,6 +147,7 @@ class CustomerAdmin(admin.ModelAdmin):
             )
         return 0
     interaction_count.short_description = 'Interacciones'
+    interaction_count.admin_order_field = 'interaction_count'
 
 
 @admin.register(Interaction)
@@ -81,11 +156,15 @@ class InteractionAdmin(admin.ModelAdmin):
         'customer', 'interaction_type', 'interaction_date',
         'time_ago', 'notes_preview'
     ]
+    # El filtro por fecha solo genera enlaces; date_hierarchy consultaba las
+    # fechas distintas de toda la tabla en cada vista
     list_filter = ['interaction_type', 'interaction_date']
     search_fields = ['customer__first_name', 'customer__last_name', 'notes']
     readonly_fields = ['id', 'time_ago']
-    list_select_related = ['customer', 'customer__company']
-    date_hierarchy = 'interaction_date'
+    list_select_related = ['customer']
+    autocomplete_fields = ['customer']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ('Información de la Interacción', {
@@ -105,3 +184,13 @@ class InteractionAdmin(admin.ModelAdmin):
             return preview
         return '-'
     notes_preview.short_description = 'Notas (preview)'
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'status', 'progress', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
+    readonly_fields = [
+        'id', 'status', 'attempts', 'progress', 'progress_message', 'result', 'error',
+        'locked_by', 'started_at', 'finished_at', 'created_at', 'updated_at'
+    ]
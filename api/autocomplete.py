@@ -0,0 +1,303 @@
+"""
+Índice de prefijos en memoria para el autocompletado de clientes, compañías
+y representantes.
+
+Cada proceso guarda una lista ordenada de términos normalizados (sin acentos,
+en minúsculas) con una referencia paralela al documento, y busca por prefijo
+con bisect: la búsqueda no consulta la base de datos.
+
+- Se construye en segundo plano, en el hilo de sincronización: al arrancar
+  cada worker (warmup.warm_index en el post_worker_init de gunicorn, que
+  espera un tiempo acotado) o, si no, tras la primera búsqueda. Mientras
+  tanto las búsquedas responden sin resultados.
+- Las altas, modificaciones y bajas del propio proceso se aplican al
+  confirmar la transacción (ver api/signals.py).
+- Las de otros workers las incorpora un hilo en segundo plano desde el feed
+  de cambios cada AUTOCOMPLETE_SYNC_SECONDS.
+- Las lecturas de la base de datos se hacen fuera del lock: una búsqueda
+  nunca espera a una consulta.
+- El tamaño está acotado por AUTOCOMPLETE_MAX_ENTRIES términos; al llegar al
+  límite los documentos nuevos no se indexan y truncated pasa a True.
+
+Las cargas de datasets (api/datasets.py) vacían el registro de cambios: el
+proceso que carga descarta su índice y los demás lo reconstruyen al
+encontrar su token caducado.
+"""
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+
+from . import changes
+from .models import Company, Customer, User
+
+logger = logging.getLogger(__name__)
+
+# Orden de construcción: compañías y representantes siempre caben
+KINDS = {
+    'company': (Company, ['id', 'name']),
+    'user': (User, ['id', 'username', 'first_name', 'last_name']),
+    'customer': (Customer, ['id', 'first_name', 'last_name', 'email']),
+}
+
+# Longitud máxima de cada término y palabras por las que se puede empezar a buscar
+KEY_LENGTH = 40
+MAX_WORDS = 4
+
+
+def indexed_rows(kind):
+    """
+    Queryset de las filas indexables de un tipo: como en los datasets, un
+    superusuario solo cuenta como representante si tiene clientes asignados.
+    """
+    model, fields = KINDS[kind]
+    queryset = model.objects.all()
+    if kind == 'user':
+        queryset = queryset.filter(
+            Q(is_superuser=False) | Exists(Customer.objects.filter(sales_rep=OuterRef('pk')))
+        )
+    return queryset
+
+
+def is_sales_rep(user):
+    return not user.is_superuser or user.customers.exists()
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.lower().split())
+
+
+def terms(*texts):
+    """
+    Términos de búsqueda: cada texto desde cada una de sus primeras palabras
+    ('ana maria lopez', 'maria lopez', 'lopez').
+    """
+    result = []
+    for text in texts:
+        words = normalize(text).split()
+        for start in range(min(len(words), MAX_WORDS)):
+            result.append(' '.join(words[start:])[:KEY_LENGTH])
+    return list(dict.fromkeys(result))
+
+
+def document(kind, row):
+    """(etiqueta, detalle, términos) de una fila de compañía, usuario o cliente"""
+    if kind == 'company':
+        return row['name'], '', terms(row['name'])
+    name = f"{row['first_name']} {row['last_name']}".strip()
+    if kind == 'user':
+        return name or row['username'], row['username'], terms(name, row['username'])
+    return name, row['email'], terms(name, row['email'])
+
+
+class PrefixIndex:
+    def __init__(self, max_entries, sync_seconds):
+        self.max_entries = max_entries
+        self.sync_seconds = sync_seconds
+        self.lock = threading.RLock()
+        self.thread = None
+        # Se activa al terminar cada construcción (ver warmup.warm_index)
+        self.ready = threading.Event()
+        self.reset()
+
+    def reset(self):
+        """Descarta el índice; el hilo de sincronización lo reconstruye"""
+        with self.lock:
+            self.keys = []
+            self.refs = []
+            # (tipo, id) -> (etiqueta, detalle, términos)
+            self.documents = {}
+            self.token = None
+            self.synced_at = 0
+            self.built = False
+            self.truncated = False
+            self.ready.clear()
+
+    def build(self):
+        """
+        Carga todas las filas con una consulta por modelo y ordena una sola
+        vez; el lock solo se toma para sustituir el índice anterior.
+        """
+        # Token previo a la lectura: los cambios concurrentes se vuelven a aplicar
+        token = changes.head_token()
+        entries = []
+        documents = {}
+        truncated = False
+        for kind, (model, fields) in KINDS.items():
+            queryset = indexed_rows(kind).order_by('-updated_at').values(*fields)
+            for row in queryset.iterator(chunk_size=5000):
+                label, detail, keys = document(kind, row)
+                if len(entries) + len(keys) > self.max_entries:
+                    truncated = True
+                    break
+                ref = (kind, row['id'])
+                documents[ref] = (label, detail, keys)
+                entries.extend((key, ref) for key in keys)
+
+        entries.sort(key=lambda entry: entry[0])
+        keys = [key for key, ref in entries]
+        refs = [ref for key, ref in entries]
+        with self.lock:
+            self.keys = keys
+            self.refs = refs
+            self.documents = documents
+            self.truncated = truncated
+            self.token = token
+            self.synced_at = time.monotonic()
+            self.built = True
+            self.ready.set()
+
+    def _remove(self, ref):
+        current = self.documents.pop(ref, None)
+        if current is None:
+            return
+        for key in current[2]:
+            position = bisect_left(self.keys, key)
+            while self.refs[position] != ref:
+                position += 1
+            del self.keys[position]
+            del self.refs[position]
+
+    def _insert(self, ref, row):
+        label, detail, keys = document(ref[0], row)
+        if len(self.keys) + len(keys) > self.max_entries:
+            self.truncated = True
+            return
+        self.documents[ref] = (label, detail, keys)
+        for key in keys:
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.refs.insert(position, ref)
+
+    def _apply(self, updates):
+        """
+        Aplica {ref: fila, o None para quitarla} con un solo recorrido de las
+        listas, en lugar de un insert/del O(n) por término. Llamar con el lock.
+        """
+        removed = {}
+        for ref in updates:
+            current = self.documents.pop(ref, None)
+            if current is not None:
+                removed[ref] = current
+        size = len(self.keys) - sum(len(current[2]) for current in removed.values())
+
+        added = []
+        for ref, row in updates.items():
+            if not row:
+                continue
+            label, detail, keys = document(ref[0], row)
+            if size + len(keys) > self.max_entries:
+                self.truncated = True
+                continue
+            self.documents[ref] = (label, detail, keys)
+            added.extend((key, ref) for key in keys)
+            size += len(keys)
+        if not removed and not added:
+            return
+
+        entries = zip(self.keys, self.refs)
+        if removed:
+            entries = ((key, ref) for key, ref in entries if ref not in removed)
+        added.sort(key=lambda entry: entry[0])
+        merged = list(heapq.merge(entries, added, key=lambda entry: entry[0]))
+        self.keys = [key for key, ref in merged]
+        self.refs = [ref for key, ref in merged]
+
+    def upsert(self, kind, row):
+        """Indexa (o reindexa) una fila; sin efecto si el índice aún no existe"""
+        with self.lock:
+            if not self.built:
+                return
+            ref = (kind, row['id'])
+            self._remove(ref)
+            self._insert(ref, row)
+
+    def delete(self, kind, object_id):
+        with self.lock:
+            if self.built:
+                self._remove((kind, object_id))
+
+    def catch_up(self):
+        """
+        Aplica las entradas del feed de cambios posteriores al último token.
+        Cada página se lee sin el lock y se aplica entera de una vez, con el
+        lock tomado solo para recomponer las listas. Si el token caducó
+        (changes.prune o una carga de datasets) reconstruye el índice completo.
+        """
+        has_more = True
+        while has_more:
+            try:
+                results, token, has_more = changes.changes_since(
+                    self.token, changes.MAX_PAGE_SIZE, list(KINDS)
+                )
+            except changes.TokenExpired:
+                self.build()
+                return
+            # data es None si el objeto se borró después: su baja llega más adelante
+            updates = {(change['model'], change['id']): change.get('data') for change in results}
+            user_ids = [object_id for kind, object_id in updates if kind == 'user' and updates[kind, object_id]]
+            if user_ids:
+                reps = set(indexed_rows('user').filter(pk__in=user_ids).values_list('pk', flat=True))
+                for user_id in user_ids:
+                    if user_id not in reps:
+                        updates['user', user_id] = None
+            with self.lock:
+                self._apply(updates)
+                self.token = token
+        self.synced_at = time.monotonic()
+
+    def sync(self):
+        """Construye el índice si no existe o lo pone al día"""
+        if self.built:
+            self.catch_up()
+        else:
+            self.build()
+
+    def start(self):
+        """Arranca (una vez por proceso) el hilo que construye el índice y lo mantiene al día"""
+        with self.lock:
+            if self.thread is not None and self.thread.is_alive():
+                return
+            self.thread = threading.Thread(target=self._run, name='autocomplete-sync', daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.sync()
+            except Exception:
+                logger.exception('Fallo al sincronizar el índice de autocompletado')
+                # Reintentar con una conexión nueva en la siguiente vuelta
+                connection.close()
+            time.sleep(self.sync_seconds)
+
+    def search(self, query, limit=10):
+        """Primeros documentos (en orden alfabético del término) cuyo término empieza por query"""
+        prefix = normalize(query)[:KEY_LENGTH]
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        with self.lock:
+            position = bisect_left(self.keys, prefix)
+            while position < len(self.keys) and len(results) < limit:
+                if not self.keys[position].startswith(prefix):
+                    break
+                ref = self.refs[position]
+                if ref not in seen:
+                    seen.add(ref)
+                    label, detail, keys = self.documents[ref]
+                    results.append({'type': ref[0], 'id': ref[1], 'label': label, 'detail': detail})
+                position += 1
+        return results
+
+
+index = PrefixIndex(settings.AUTOCOMPLETE_MAX_ENTRIES, settings.AUTOCOMPLETE_SYNC_SECONDS)
@@ -0,0 +1,238 @@
+"""
+Feed incremental de cambios (delta sync) basado en ChangeLogEntry.
+
+Las entradas se ordenan por (txid, id). Solo se entregan las escritas por
+transacciones anteriores a la más antigua que sigue en curso
+(pg_snapshot_xmin), de modo que una transacción larga que confirme más
+tarde nunca queda por detrás de un token ya entregado.
+
+Contrapartida: mientras una transacción con escrituras siga abierta, el feed
+no avanza más allá de ella. idle_in_transaction_session_timeout (settings)
+corta las que quedan olvidadas y status() expone la más antigua y las
+entradas retenidas para poder vigilarlo.
+
+Las entradas de más de CHANGELOG_RETENTION_DAYS días se borran con el trabajo
+prune_changes (api/jobs.py). Un token cuya entrada ya se borró es
+TokenExpired: el cliente debe volver a descargar todo y empezar de nuevo.
+"""
+import base64
+import binascii
+from datetime import timedelta
+from itertools import takewhile
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from .models import ChangeLogEntry, Company, Customer, Interaction, User
+
+# Modelos sincronizables y columnas que se envían en cada alta/modificación
+TRACKED_MODELS = {
+    'customer': (Customer, [
+        'id', 'first_name', 'last_name', 'email', 'date_of_birth',
+        'company_id', 'sales_rep_id', 'created_at', 'updated_at',
+    ]),
+    'company': (Company, ['id', 'name', 'created_at', 'updated_at']),
+    'user': (User, [
+        'id', 'username', 'first_name', 'last_name', 'email', 'is_admin',
+        'created_at', 'updated_at',
+    ]),
+    'interaction': (Interaction, [
+        'id', 'customer_id', 'interaction_type', 'notes', 'interaction_date', 'updated_at',
+    ]),
+}
+
+MAX_PAGE_SIZE = 1000
+PRUNE_BATCH_SIZE = 5000
+
+# Canal de NOTIFY con el nombre del modelo como payload (ver api/stream.py)
+NOTIFY_CHANNEL = 'changes'
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+class TokenExpired(Exception):
+    """La entrada del token se borró por antigüedad: hay que resincronizar"""
+
+
+def encode_token(txid, entry_id):
+    """Token opaco con la posición (txid, id) de la última entrada entregada"""
+    return base64.urlsafe_b64encode(f'{txid}:{entry_id}'.encode()).decode().rstrip('=')
+
+
+def decode_token(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        txid, entry_id = raw.split(':')
+        return int(txid), int(entry_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidToken(token)
+
+
+def check_token(token):
+    """Posición (txid, id) del token; TokenExpired si su entrada ya se borró"""
+    txid, entry_id = decode_token(token)
+    # Se borra siempre un prefijo del feed: si la entrada sigue, no falta nada detrás
+    if not ChangeLogEntry.objects.filter(pk=entry_id, txid=txid).exists():
+        raise TokenExpired(token)
+    return txid, entry_id
+
+
+def snapshot_xmin():
+    """Transacción en curso más antigua (o la siguiente si no hay ninguna)"""
+    return RawSQL('pg_snapshot_xmin(pg_current_snapshot())::text::bigint', [])
+
+
+def visible_entries():
+    """Entradas de transacciones que ya no pueden ser adelantadas por otras en curso"""
+    return ChangeLogEntry.objects.filter(txid__lt=snapshot_xmin())
+
+
+def record(model, object_ids, action, customer_ids=None):
+    """
+    Registra una entrada por cada id en la transacción actual. customer_ids
+    ({id: cliente}) acompaña a las bajas de interacciones (ver read_page en
+    api/stream.py).
+    """
+    customer_ids = customer_ids or {}
+    created = ChangeLogEntry.objects.bulk_create(
+        ChangeLogEntry(
+            model=model, object_id=object_id, action=action, customer_id=customer_ids.get(object_id)
+        )
+        for object_id in object_ids
+    )
+    if created:
+        # Se entrega al confirmar la transacción; PostgreSQL une los duplicados
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [NOTIFY_CHANNEL, model])
+
+
+def head_token():
+    """Token de la última entrada visible, para empezar a sincronizar desde ahora"""
+    last = visible_entries().order_by('-txid', '-id').values_list('txid', 'id').first()
+    return encode_token(*last) if last else None
+
+
+def changes_since(token=None, limit=MAX_PAGE_SIZE, models=None):
+    """
+    Retorna (cambios, siguiente_token, hay_más). Cada cambio incluye la última
+    acción de cada objeto dentro de la página y, salvo en las bajas, sus datos
+    actuales obtenidos con una consulta por modelo.
+    """
+    entries = visible_entries()
+    if token:
+        txid, entry_id = check_token(token)
+        entries = entries.filter(Q(txid__gt=txid) | Q(txid=txid, id__gt=entry_id))
+    if models:
+        entries = entries.filter(model__in=models)
+
+    page = list(
+        entries.order_by('txid', 'id')
+        .values_list('txid', 'id', 'model', 'object_id', 'action', 'changed_at', 'customer_id')[:limit + 1]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+    if not page:
+        return [], token, False
+
+    # Solo la última acción por objeto: el cliente no necesita los estados intermedios
+    latest = {}
+    for txid, entry_id, model, object_id, action, changed_at, customer_id in page:
+        latest.pop((model, object_id), None)
+        latest[(model, object_id)] = {
+            'model': model,
+            'id': object_id,
+            'action': action,
+            'changed_at': changed_at,
+        }
+        if action == ChangeLogEntry.Action.DELETE and customer_id:
+            latest[(model, object_id)]['customer_id'] = customer_id
+
+    upserts = {}
+    for (model, object_id), change in latest.items():
+        if change['action'] != ChangeLogEntry.Action.DELETE:
+            upserts.setdefault(model, []).append(object_id)
+
+    rows = {}
+    for model, ids in upserts.items():
+        model_class, fields = TRACKED_MODELS[model]
+        for row in model_class.objects.filter(pk__in=ids).order_by().values(*fields):
+            rows[(model, row['id'])] = row
+
+    changes = []
+    for key, change in latest.items():
+        if change['action'] != ChangeLogEntry.Action.DELETE:
+            # None si el objeto se borró después; su baja llegará en una página posterior
+            change['data'] = rows.get(key)
+        changes.append(change)
+
+    last_txid, last_id = page[-1][0], page[-1][1]
+    return changes, encode_token(last_txid, last_id), has_more
+
+
+def prune(retention_days=None, batch_size=PRUNE_BATCH_SIZE, progress=None):
+    """
+    Borra por lotes las entradas de más de retention_days días, recorriendo el
+    feed en orden (txid, id) y parando en la primera más reciente: lo borrado
+    es siempre un prefijo, que es lo que permite detectar tokens caducados.
+    Retorna el número de entradas borradas.
+    """
+    if retention_days is None:
+        retention_days = settings.CHANGELOG_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=retention_days)
+
+    deleted = 0
+    while True:
+        batch = list(
+            visible_entries().order_by('txid', 'id')
+            .values_list('id', 'changed_at')[:batch_size]
+        )
+        expired = list(takewhile(lambda entry: entry[1] < cutoff, batch))
+        if expired:
+            ChangeLogEntry.objects.filter(pk__in=[entry_id for entry_id, _ in expired]).delete()
+            deleted += len(expired)
+            if progress:
+                progress(deleted)
+        if len(expired) < batch_size:
+            return deleted
+
+
+def status():
+    """
+    Estado del feed: entradas retenidas por transacciones en curso y la
+    transacción con escrituras más antigua, que es la que frena el feed.
+    """
+    pending = ChangeLogEntry.objects.filter(txid__gte=snapshot_xmin()).count()
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT pid, state, application_name, xact_start,
+                   extract(epoch FROM now() - xact_start)
+            FROM pg_stat_activity
+            WHERE backend_xid IS NOT NULL AND pid <> pg_backend_pid()
+            ORDER BY age(backend_xid) DESC
+            LIMIT 1
+        """)
+        row = cursor.fetchone()
+
+    oldest = None
+    if row:
+        pid, state, application_name, started_at, age = row
+        oldest = {
+            'pid': pid,
+            'state': state,
+            'application_name': application_name,
+            'started_at': started_at,
+            'age_seconds': round(age, 1),
+        }
+    oldest_entry = ChangeLogEntry.objects.order_by('txid', 'id').values_list('changed_at', flat=True).first()
+    return {
+        'head_token': head_token(),
+        'pending_entries': pending,
+        'oldest_transaction': oldest,
+        'oldest_entry_at': oldest_entry,
+        'retention_days': settings.CHANGELOG_RETENTION_DAYS,
+    }
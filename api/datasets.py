@@ -0,0 +1,452 @@
+"""
+Datasets de prueba reproducibles y snapshots para cargarlos en segundos.
+
+generate() crea representantes, compañías, clientes e interacciones. Con la
+misma semilla y fecha de referencia se obtienen los mismos ids, nombres y
+fechas, y las tablas derivadas (agregados y resúmenes, con la actividad
+reciente referida a esa fecha) se reconstruyen después con el mismo
+contenido.
+
+save_snapshot() vuelca cada tabla con COPY ... (FORMAT BINARY) comprimido
+con gzip, ordenada por clave primaria; los superusuarios no forman parte del
+dataset. restore_snapshot() la carga con COPY ... FROM STDIN. El formato binario depende del esquema, así que el
+manifest guarda la última migración aplicada y las columnas de cada tabla.
+Un snapshot de otra versión del esquema se rechaza y hay que regenerarlo.
+La salida de Faker puede cambiar entre versiones: para comparar resultados
+entre máquinas, compartir el snapshot, no la semilla.
+"""
+import gzip
+import json
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.utils import timezone
+from faker import Faker
+from psycopg import sql
+
+from . import autocomplete, rollups, summaries
+from .models import (
+    ArchivedInteraction, ChangeLogEntry, Company, Customer, CustomerInteractionSummary, Interaction,
+    InteractionDailyRollup, User
+)
+
+# Tablas del dataset en orden de carga (las referenciadas primero)
+DATASET_MODELS = [
+    User, Company, Customer, Interaction, ArchivedInteraction,
+    InteractionDailyRollup, CustomerInteractionSummary,
+]
+
+TIERS = {
+    'small': {'users': 3, 'customers': 200, 'interactions_per_customer': 25},
+    'medium': {'users': 5, 'customers': 2000, 'interactions_per_customer': 50},
+    'large': {'users': 3, 'customers': 1000, 'interactions_per_customer': 500},
+}
+
+DEFAULT_SEED = 42
+# Fecha a la que se refieren las fechas generadas cuando hay semilla
+REFERENCE_DATE = date(2026, 1, 1)
+
+SNAPSHOT_FORMAT = 1
+MANIFEST = 'manifest.json'
+BATCH_SIZE = 5000
+CHUNK_SIZE = 1024 * 1024
+
+COMPANY_NAMES = [
+    'TechCorp Solutions', 'Global Industries', 'Innovation Labs',
+    'Digital Dynamics', 'Future Systems', 'Elite Enterprises',
+    'Prime Technology', 'Advanced Solutions', 'Smart Industries',
+    'NextGen Corp', 'Alpha Technologies', 'Beta Systems',
+    'Gamma Solutions', 'Delta Industries', 'Omega Tech',
+    'Synergy Group', 'Quantum Labs', 'Vertex Solutions',
+    'Matrix Corp', 'Phoenix Systems', 'Stellar Technologies',
+    'Apex Industries', 'Zenith Solutions', 'Summit Corp',
+    'Pinnacle Tech', 'Horizon Systems', 'Catalyst Group',
+    'Nexus Solutions', 'Prism Technologies', 'Eclipse Corp'
+]
+
+SAMPLE_NOTES = [
+    'Cliente interesado en el producto',
+    'Seguimiento de propuesta comercial',
+    'Reunión de presentación programada',
+    'Cliente solicita más información',
+    'Negociación de precios',
+    'Firma de contrato pendiente',
+    'Soporte técnico requerido',
+    'Renovación de contrato',
+    'Cliente satisfecho con el servicio',
+    'Feedback positivo recibido',
+    'Problema técnico resuelto',
+    'Nueva oportunidad de negocio',
+    'Referencia a otros clientes',
+    'Actualización de datos',
+    'Confirmación de entrega',
+    ''  # Nota vacía ocasional
+]
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+@contextmanager
+def fixed_timestamps(models):
+    """Desactiva auto_now/auto_now_add para poder fijar created_at y updated_at"""
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    for field, auto_now, auto_now_add in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+@contextmanager
+def immediate_constraints():
+    """
+    Comprueba en el momento las claves foráneas diferidas (incluidas las ya
+    pendientes en la transacción): TRUNCATE y ALTER TABLE fallan si la tabla
+    tiene comprobaciones pendientes.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        yield
+        cursor.execute('SET CONSTRAINTS ALL DEFERRED')
+
+
+def reset_change_feed():
+    """
+    Las cargas masivas no pasan por las señales: vacía el registro de cambios,
+    con lo que los tokens entregados caducan (410, los clientes resincronizan),
+    y al confirmar descarta el índice de autocompletado del proceso. Los demás
+    workers lo reconstruyen al encontrar su token caducado.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql.SQL('TRUNCATE {}').format(sql.Identifier(ChangeLogEntry._meta.db_table)))
+    transaction.on_commit(autocomplete.index.reset)
+
+
+def clear():
+    """Vacía las tablas del dataset con TRUNCATE (sin cargar filas ni enviar señales)"""
+    tables = ', '.join(
+        connection.ops.quote_name(model._meta.db_table)
+        for model in DATASET_MODELS if model is not User
+    )
+    with transaction.atomic(), immediate_constraints(), connection.cursor() as cursor:
+        cursor.execute(f'TRUNCATE {tables} RESTART IDENTITY')
+        User.objects.filter(is_superuser=False).delete()
+        # Después del borrado de usuarios, que también registra sus bajas
+        reset_change_feed()
+
+
+def generate(users=3, customers=1000, interactions_per_customer=500, seed=None,
+             reference_date=None, progress=None):
+    """
+    Reemplaza los datos por un dataset nuevo. Sin semilla los datos son
+    aleatorios y relativos a ahora; con semilla, deterministas y relativos a
+    reference_date (REFERENCE_DATE por defecto). progress(mensaje) informa
+    del avance. Retorna el número de filas creadas por modelo.
+    """
+    report = progress or (lambda message: None)
+    rng = random.Random(seed)
+    fake = Faker(['es_ES', 'en_US'])  # Usar datos en español e inglés
+    if seed is None:
+        now = timezone.now()
+    else:
+        fake.seed_instance(seed)
+        now = timezone.make_aware(datetime.combine(reference_date or REFERENCE_DATE, time()))
+    today = timezone.localdate(now)
+
+    def new_id():
+        return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+    clear()
+    with fixed_timestamps([User, Company, Customer, Interaction]):
+        password = make_password('password123', salt=f'dataset{seed}' if seed is not None else None)
+        reps = User.objects.bulk_create([
+            User(
+                id=new_id(),
+                username=f'rep_{i+1}',
+                email=fake.email(),
+                password=password,
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+                is_admin=i == 0,  # El primer usuario será admin
+                date_joined=now,
+                created_at=now,
+                updated_at=now,
+            )
+            for i in range(users)
+        ])
+        report(f'{len(reps)} representantes de ventas')
+
+        companies = Company.objects.bulk_create([
+            Company(id=new_id(), name=name, created_at=now, updated_at=now)
+            for name in COMPANY_NAMES
+        ])
+        report(f'{len(companies)} compañías')
+
+        customer_ids = []
+        batch = []
+        for i in range(customers):
+            # Fecha de nacimiento realista (entre 18 y 80 años)
+            batch.append(Customer(
+                id=new_id(),
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+                email=fake.unique.email(),
+                date_of_birth=today - timedelta(days=rng.randint(18 * 365, 80 * 365)),
+                company=rng.choice(companies),
+                sales_rep=rng.choice(reps),
+                created_at=now,
+                updated_at=now,
+            ))
+            if len(batch) == BATCH_SIZE or i == customers - 1:
+                customer_ids.extend(customer.id for customer in Customer.objects.bulk_create(batch))
+                batch = []
+                report(f'{len(customer_ids):,} clientes')
+
+        interaction_types = Interaction.InteractionType.values
+        total = 0
+        batch = []
+        for customer_id in customer_ids:
+            for _ in range(interactions_per_customer):
+                # Fecha aleatoria en los últimos 2 años, en horario laboral
+                interaction_date = now - timedelta(days=rng.randint(0, 730)) + timedelta(
+                    hours=rng.randint(8, 18),
+                    minutes=rng.randint(0, 59)
+                )
+                batch.append(Interaction(
+                    id=new_id(),
+                    customer_id=customer_id,
+                    interaction_type=rng.choice(interaction_types),
+                    notes=rng.choice(SAMPLE_NOTES),
+                    interaction_date=interaction_date,
+                    updated_at=interaction_date,
+                ))
+                if len(batch) == BATCH_SIZE:
+                    Interaction.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+                    report(f'{total:,} interacciones')
+        if batch:
+            Interaction.objects.bulk_create(batch)
+            total += len(batch)
+            report(f'{total:,} interacciones')
+
+    # bulk_create no dispara señales: reconstruir las tablas derivadas
+    rollups.rebuild_all()
+    report('agregados diarios reconstruidos')
+    summaries.rebuild_all(today=today)
+    if seed is not None:
+        CustomerInteractionSummary.objects.update(updated_at=now)
+    report('resúmenes por cliente reconstruidos')
+    reset_change_feed()
+
+    return {
+        'users': len(reps),
+        'companies': len(companies),
+        'customers': len(customer_ids),
+        'interactions': total,
+    }
+
+
+def schema_version():
+    """Última migración aplicada de la app"""
+    applied = MigrationRecorder(connection).applied_migrations()
+    return max(name for app, name in applied if app == 'api')
+
+
+def _columns(model):
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def _dataset_rows(model):
+    """Filas del dataset de cada tabla: los superusuarios se conservan al cargar otro"""
+    if model is User:
+        return User.objects.filter(is_superuser=False)
+    return model.objects.all()
+
+
+def save_snapshot(path, metadata=None):
+    """Vuelca las tablas del dataset en el directorio path. Retorna el manifest"""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        'format': SNAPSHOT_FORMAT,
+        'schema': schema_version(),
+        'dataset': metadata or {},
+        'tables': {},
+    }
+    # Una sola transacción REPEATABLE READ: todas las tablas del mismo instante.
+    # Dentro de una transacción ya abierta (tests) solo se puede usar la suya
+    outer = connection.in_atomic_block
+    with transaction.atomic(), connection.cursor() as cursor:
+        if not outer:
+            cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY')
+        for model in DATASET_MODELS:
+            table, columns = model._meta.db_table, _columns(model)
+            query = sql.SQL('COPY (SELECT {} FROM {} {} ORDER BY {}) TO STDOUT (FORMAT BINARY)').format(
+                sql.SQL(', ').join(map(sql.Identifier, columns)),
+                sql.Identifier(table),
+                sql.SQL('WHERE NOT is_superuser' if model is User else ''),
+                sql.Identifier(model._meta.pk.column),
+            )
+            filename = f'{table}.copy.gz'
+            # mtime=0: el mismo dataset produce los mismos bytes
+            with gzip.GzipFile(path / filename, 'wb', compresslevel=1, mtime=0) as output:
+                with cursor.copy(query) as copy:
+                    for data in copy:
+                        output.write(data)
+            manifest['tables'][table] = {
+                'file': filename,
+                'columns': columns,
+                'rows': _dataset_rows(model).count(),
+            }
+
+    (path / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def read_manifest(path):
+    try:
+        manifest = json.loads((Path(path) / MANIFEST).read_text())
+    except (OSError, ValueError):
+        raise SnapshotError(f'{path} no contiene un snapshot válido')
+    if manifest.get('format') != SNAPSHOT_FORMAT:
+        raise SnapshotError(f'Formato de snapshot no soportado: {manifest.get("format")}')
+    return manifest
+
+
+def check_compatible(manifest):
+    """El formato binario de COPY exige exactamente las mismas columnas y tipos"""
+    if manifest['schema'] != schema_version():
+        raise SnapshotError(
+            f'El snapshot es de la migración {manifest["schema"]} y la base de datos '
+            f'está en {schema_version()}: regenerarlo'
+        )
+    for model in DATASET_MODELS:
+        saved = manifest['tables'].get(model._meta.db_table)
+        if saved is None or saved['columns'] != _columns(model):
+            raise SnapshotError(f'Las columnas de {model._meta.db_table} no coinciden: regenerar el snapshot')
+
+
+def _drop_deferred_schema(cursor, tables):
+    """
+    Elimina los índices secundarios y las claves foráneas de las tablas y
+    retorna las sentencias para recrearlos: construir un índice o validar una
+    clave sobre la tabla llena es mucho más rápido que hacerlo fila a fila.
+    """
+    cursor.execute(
+        """
+        SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i JOIN pg_class t ON t.oid = i.indrelid
+        WHERE t.relname = ANY(%s) AND t.relnamespace = 'public'::regnamespace
+          AND NOT EXISTS (
+              SELECT 1 FROM pg_constraint c
+              WHERE c.conindid = i.indexrelid AND c.conrelid = i.indrelid
+          )
+        """,
+        [tables]
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT c.conrelid::regclass::text, quote_ident(c.conname), pg_get_constraintdef(c.oid)
+        FROM pg_constraint c JOIN pg_class t ON t.oid = c.conrelid
+        WHERE c.contype = 'f' AND t.relname = ANY(%s) AND t.relnamespace = 'public'::regnamespace
+        """,
+        [tables]
+    )
+    foreign_keys = cursor.fetchall()
+
+    for name, definition in indexes:
+        cursor.execute(f'DROP INDEX {name}')
+    for table, name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT {name}')
+    return [definition for name, definition in indexes] + [
+        f'ALTER TABLE {table} ADD CONSTRAINT {name} {definition}'
+        for table, name, definition in foreign_keys
+    ]
+
+
+def restore_snapshot(path, replace=False):
+    """
+    Carga el snapshot en tablas vacías (replace=True las vacía antes con
+    clear(): se conservan los superusuarios y las tablas de fuera del dataset).
+    Retorna el manifest.
+    """
+    path = Path(path)
+    manifest = read_manifest(path)
+    check_compatible(manifest)
+    tables = [model._meta.db_table for model in DATASET_MODELS]
+
+    with transaction.atomic(), immediate_constraints(), connection.cursor() as cursor:
+        if replace:
+            clear()
+        else:
+            non_empty = [model._meta.db_table for model in DATASET_MODELS if _dataset_rows(model).exists()]
+            if non_empty:
+                raise SnapshotError(f'Las tablas no están vacías: {", ".join(non_empty)}')
+
+        # Como pg_restore: primero los datos, después índices y claves foráneas
+        deferred = _drop_deferred_schema(cursor, tables)
+        for model in DATASET_MODELS:
+            saved = manifest['tables'][model._meta.db_table]
+            query = sql.SQL('COPY {} ({}) FROM STDIN (FORMAT BINARY)').format(
+                sql.Identifier(model._meta.db_table),
+                sql.SQL(', ').join(map(sql.Identifier, saved['columns'])),
+            )
+            with gzip.open(path / saved['file'], 'rb') as source, cursor.copy(query) as copy:
+                while data := source.read(CHUNK_SIZE):
+                    copy.write(data)
+        for statement in deferred:
+            cursor.execute(statement)
+
+        # Secuencias de las claves autoincrementales y estadísticas del planificador
+        for statement in connection.ops.sequence_reset_sql(no_style(), DATASET_MODELS):
+            cursor.execute(statement)
+        for table in tables:
+            cursor.execute(sql.SQL('ANALYZE {}').format(sql.Identifier(table)))
+        reset_change_feed()
+
+    return manifest
+
+
+def snapshot_path(tier, seed=DEFAULT_SEED, directory=None):
+    return Path(directory or settings.DATASET_SNAPSHOT_DIR) / f'{tier}-{seed}'
+
+
+def load_dataset(tier='small', seed=DEFAULT_SEED, directory=None, progress=None):
+    """
+    Deja en la base de datos el dataset (tier, seed), reemplazando los datos
+    actuales: restaura su snapshot o, si no existe o es de otro esquema, lo
+    genera y guarda el snapshot para la próxima vez. Pensado para tests
+    (setUpTestData) y benchmarks. Retorna el manifest.
+    """
+    path = snapshot_path(tier, seed, directory)
+    try:
+        return restore_snapshot(path, replace=True)
+    except SnapshotError:
+        pass
+
+    counts = generate(seed=seed, progress=progress, **TIERS[tier])
+    metadata = {
+        'tier': tier,
+        'seed': seed,
+        'reference_date': REFERENCE_DATE.isoformat(),
+        'counts': counts,
+    }
+    return save_snapshot(path, metadata)
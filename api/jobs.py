@@ -0,0 +1,247 @@
+"""
+Cola de trabajos en segundo plano respaldada por la tabla Job.
+
+Cada tipo de trabajo se registra con el decorador @job y recibe la instancia
+de Job (payload, report_progress). El comando run_jobs reclama y ejecuta los
+trabajos; los fallos se reintentan con espera exponencial hasta max_attempts.
+Los tipos de PERIODIC los encola el propio run_jobs (schedule_periodic).
+"""
+import csv
+import logging
+import traceback
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import changes, rollups, summaries
+from .models import Customer, Job
+from .services import archive_conflicts, archive_interactions
+
+logger = logging.getLogger(__name__)
+
+# Un trabajo en curso sin latido durante este tiempo se considera abandonado
+STALE_AFTER = timedelta(minutes=10)
+RETRY_BASE_DELAY = timedelta(seconds=30)
+
+# Tipo de trabajo -> intervalo entre ejecuciones
+PERIODIC = {
+    'prune_changes': timedelta(days=1),
+}
+SCHEDULE_LOCK_ID = zlib.crc32(b'jobs.schedule_periodic')
+
+registry = {}
+
+
+def job(kind):
+    """Registra la función como manejador de los trabajos de tipo kind"""
+    def decorator(func):
+        registry[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, payload=None, **fields):
+    """Encola un trabajo y lo retorna"""
+    if kind not in registry:
+        raise ValueError(f'Tipo de trabajo desconocido: {kind}')
+    return Job.objects.create(kind=kind, payload=payload or {}, **fields)
+
+
+def schedule_periodic():
+    """
+    Encola cada trabajo periódico que no tenga ya uno pendiente o en curso,
+    para intervalo después del último terminado. Retorna los encolados.
+    """
+    scheduled = []
+    with transaction.atomic():
+        # Varios workers lo llaman a la vez: solo uno decide
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [SCHEDULE_LOCK_ID])
+        for kind, interval in PERIODIC.items():
+            jobs = Job.objects.filter(kind=kind)
+            if jobs.filter(status__in=[Job.Status.QUEUED, Job.Status.RUNNING]).exists():
+                continue
+            last = (
+                jobs.filter(finished_at__isnull=False)
+                .order_by('-finished_at').values_list('finished_at', flat=True).first()
+            )
+            scheduled.append(enqueue(kind, run_after=last + interval if last else timezone.now()))
+    return scheduled
+
+
+def claim(worker_id, kinds=None):
+    """Reclama el siguiente trabajo pendiente (o abandonado) para este worker"""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = Job.objects.select_for_update(skip_locked=True).filter(
+            Q(status=Job.Status.QUEUED, run_after__lte=now) |
+            Q(status=Job.Status.RUNNING, updated_at__lt=now - STALE_AFTER)
+        )
+        if kinds:
+            jobs = jobs.filter(kind__in=kinds)
+        claimed = jobs.order_by('run_after').first()
+        if claimed is None:
+            return None
+
+        claimed.status = Job.Status.RUNNING
+        claimed.attempts += 1
+        claimed.locked_by = worker_id
+        claimed.started_at = now
+        claimed.save(update_fields=['status', 'attempts', 'locked_by', 'started_at', 'updated_at'])
+    return claimed
+
+
+def run(claimed):
+    """Ejecuta un trabajo reclamado y registra su resultado o error"""
+    handler = registry.get(claimed.kind)
+    try:
+        if handler is None:
+            raise LookupError(f'Tipo de trabajo desconocido: {claimed.kind}')
+        if claimed.attempts > claimed.max_attempts:
+            raise RuntimeError('Trabajo abandonado demasiadas veces')
+        result = handler(claimed)
+    except Job.Lost:
+        # Otro worker lo está ejecutando: su resultado es el que cuenta
+        logger.warning('Trabajo %s (%s) reclamado por otro worker', claimed.pk, claimed.kind)
+        return claimed
+    except Exception:
+        logger.exception('Trabajo %s (%s) falló', claimed.pk, claimed.kind)
+        claimed.error = traceback.format_exc()
+        if handler is not None and claimed.attempts < claimed.max_attempts:
+            claimed.status = Job.Status.QUEUED
+            claimed.run_after = timezone.now() + RETRY_BASE_DELAY * 2 ** (claimed.attempts - 1)
+        else:
+            claimed.status = Job.Status.FAILED
+            claimed.finished_at = timezone.now()
+    else:
+        claimed.status = Job.Status.SUCCEEDED
+        claimed.result = result
+        claimed.progress = 100
+        claimed.error = ''
+        claimed.finished_at = timezone.now()
+
+    # Solo si seguimos siendo dueños: no pisar el estado de quien lo reclamó
+    claimed.updated_at = timezone.now()
+    owned = claimed.owned().update(
+        status=claimed.status,
+        result=claimed.result,
+        progress=claimed.progress,
+        error=claimed.error,
+        run_after=claimed.run_after,
+        locked_by='',
+        finished_at=claimed.finished_at,
+        updated_at=claimed.updated_at,
+    )
+    if not owned:
+        logger.warning('Trabajo %s (%s) reclamado por otro worker; resultado descartado', claimed.pk, claimed.kind)
+    claimed.locked_by = ''
+    return claimed
+
+
+@job('refresh_rollups')
+def refresh_rollups_job(current):
+    """Payload: {"days": 30} o {"since": "YYYY-MM-DD"} o {"full": true}"""
+    payload = current.payload
+    if payload.get('full'):
+        # Latido por lote: sin él un trabajo de más de STALE_AFTER se ejecutaría dos veces
+        total = Customer.objects.count()
+        return {'rows': rollups.rebuild_all(
+            progress=lambda done: current.report_progress(done, total, f'{done} clientes'),
+        )}
+
+    end = timezone.localdate()
+    if payload.get('since'):
+        start = date.fromisoformat(payload['since'])
+    else:
+        start = end - timedelta(days=int(payload.get('days', 30)))
+
+    stale = rollups.refresh_stale_days(
+        start, end,
+        progress=lambda done, total, day: current.report_progress(done, total, f'{day}'),
+    )
+    return {'days': [day.isoformat() for day in stale]}
+
+
+@job('archive_interactions')
+def archive_interactions_job(current):
+    """Payload: {"older_than_days": 365, "batch_size": 1000, "sleep": 0.1}"""
+    payload = current.payload
+    cutoff = timezone.now() - timedelta(days=int(payload.get('older_than_days', 365)))
+    total, batches = archive_interactions(
+        cutoff,
+        batch_size=int(payload.get('batch_size', 1000)),
+        sleep=float(payload.get('sleep', 0.1)),
+        # El total no se conoce de antemano: solo se informa lo archivado
+        progress=lambda total, batches: current.report_progress(
+            0, None, f'{total} interacciones archivadas'
+        ),
+    )
+    return {'archived': total, 'batches': batches, 'conflicts': archive_conflicts(cutoff).count()}
+
+
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+    ('email', 'email'),
+    ('date_of_birth', 'date_of_birth'),
+    ('company', 'company__name'),
+    ('sales_rep', 'sales_rep__username'),
+    ('created_at', 'created_at'),
+]
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_path(exported):
+    """Fichero CSV de un trabajo export_customers"""
+    return Path(settings.EXPORT_DIR) / f'customers-{exported.pk}.csv'
+
+
+@job('export_customers')
+def export_customers_job(current):
+    """Payload: {"filters": {...}} con los mismos filtros que /api/customers/"""
+    from .views import CustomerFilter
+
+    queryset = CustomerFilter(
+        current.payload.get('filters', {}), queryset=Customer.objects.order_by('pk')
+    ).qs
+    total = queryset.count()
+    path = export_path(current)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows = 0
+    with open(path, 'w', newline='') as output:
+        writer = csv.writer(output)
+        writer.writerow([name for name, field in EXPORT_COLUMNS])
+        values = queryset.values_list(*[field for name, field in EXPORT_COLUMNS])
+        for row in values.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            writer.writerow(row)
+            rows += 1
+            if rows % EXPORT_CHUNK_SIZE == 0:
+                current.report_progress(rows, total, f'{rows} clientes exportados')
+    return {'file': path.name, 'rows': rows}
+
+
+@job('rebuild_summaries')
+def rebuild_summaries_job(current):
+    """Payload vacío: reconstruye todos los resúmenes por cliente"""
+    total = Customer.objects.count()
+    created = summaries.rebuild_all(
+        progress=lambda done: current.report_progress(done, total, f'{done} clientes')
+    )
+    return {'summaries': created}
+
+
+@job('prune_changes')
+def prune_changes_job(current):
+    """Payload: {"retention_days": 30} (default: CHANGELOG_RETENTION_DAYS)"""
+    deleted = changes.prune(
+        current.payload.get('retention_days'),
+        progress=lambda deleted: current.report_progress(0, None, f'{deleted} entradas borradas'),
+    )
+    return {'deleted': deleted}
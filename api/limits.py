@@ -0,0 +1,88 @@
+"""
+Límites por endpoint para proteger la latencia de las peticiones baratas.
+
+- statement_timeout: SET LOCAL por petición (dura lo que la transacción de
+  views.AtomicViewMixin). Una consulta cancelada se responde con 503.
+- Límite de concurrencia: cada petición cara toma una de N plazas con
+  pg_try_advisory_xact_lock, compartidas entre todos los workers y hosts que
+  usan la misma base de datos. Sin plaza libre se responde 503 con
+  Retry-After en lugar de esperar; la plaza se libera al terminar la
+  transacción.
+- Contadores de timeouts y peticiones rechazadas por endpoint en la caché
+  (compartidos entre procesos si CACHE_URL apunta a un backend común).
+"""
+import zlib
+
+from django.core.cache import cache
+from django.db import connection
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+RETRY_AFTER_SECONDS = 2
+COUNTER_PREFIX = 'limits'
+
+
+class QueryTimeout(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'La consulta superó el tiempo máximo permitido. Acota los filtros o reintenta más tarde.'
+    default_code = 'query_timeout'
+    # El exception_handler de DRF lo envía como cabecera Retry-After
+    wait = RETRY_AFTER_SECONDS
+
+
+class Overloaded(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Demasiadas peticiones de este tipo en curso. Reintenta en unos segundos.'
+    default_code = 'overloaded'
+    wait = RETRY_AFTER_SECONDS
+
+
+def set_statement_timeout(milliseconds):
+    """Tiempo máximo por consulta hasta el final de la transacción actual"""
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT set_config('statement_timeout', %s, true)", [str(int(milliseconds))])
+
+
+def acquire_slot(scope, slots):
+    """
+    Toma una de las plazas del scope hasta el final de la transacción.
+    Retorna el número de plaza o None si están todas ocupadas.
+    """
+    key = zlib.crc32(scope.encode()) & 0x7fffffff
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT slot FROM generate_series(0, %s - 1) AS slot '
+            'WHERE pg_try_advisory_xact_lock(%s, slot) LIMIT 1',
+            [slots, key]
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _counter_key(kind, scope):
+    return f'{COUNTER_PREFIX}:{kind}:{scope}'
+
+
+def count(kind, scope):
+    """Incrementa el contador kind ('timeouts' o 'shed') del scope"""
+    key = _counter_key(kind, scope)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # La clave expiró o se desalojó entre add e incr
+        cache.set(key, 1, timeout=None)
+
+
+def counters(scopes):
+    """{scope: {'timeouts': n, 'shed': n}} para los scopes indicados"""
+    keys = {
+        _counter_key(kind, scope): (scope, kind)
+        for scope in scopes for kind in ('timeouts', 'shed')
+    }
+    values = cache.get_many(keys)
+    result = {scope: {'timeouts': 0, 'shed': 0} for scope in scopes}
+    for key, value in values.items():
+        scope, kind = keys[key]
+        result[scope][kind] = value
+    return result
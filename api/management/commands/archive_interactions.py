@@ -0,0 +1,60 @@
+"""
+Django command to move old interactions to the archive table in small batches
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.services import archive_conflicts, archive_interactions
+
+
+class Command(BaseCommand):
+    """Archiva interacciones antiguas en lotes pequeños, reanudables y con pausas"""
+
+    help = 'Mueve las interacciones más antiguas que --older-than-days a la tabla de archivo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=365,
+            help='Antigüedad mínima en días de las interacciones a archivar (default: 365)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Interacciones movidas por transacción (default: 1000)'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0.1,
+            help='Pausa en segundos entre lotes (default: 0.1)'
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Detenerse tras este número de lotes (default: sin límite)'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        self.stdout.write(f'🗄️  Archivando interacciones anteriores a {cutoff:%Y-%m-%d}...')
+
+        total, batches = archive_interactions(
+            cutoff,
+            batch_size=options['batch_size'],
+            sleep=options['sleep'],
+            max_batches=options['max_batches'],
+            progress=lambda total, batches: self.stdout.write(f'   ✓ {total:,} interacciones archivadas...'),
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'✅ {total:,} interacciones archivadas en {batches} lotes'))
+        conflicts = archive_conflicts(cutoff).count()
+        if conflicts:
+            self.stdout.write(self.style.WARNING(
+                f'⚠️  {conflicts:,} interacciones sin archivar: su id ya está en el archivo'
+            ))
@@ -0,0 +1,44 @@
+"""
+Django command to save and restore dataset snapshots
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import datasets
+
+
+class Command(BaseCommand):
+    """
+    save vuelca las tablas del dataset con COPY binario; restore las carga en
+    una base de datos vacía (o reemplaza los datos con --replace).
+    """
+
+    help = 'Guarda o restaura un snapshot de los datos (usuarios, compañías, clientes, interacciones y agregados)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['save', 'restore'])
+        parser.add_argument('path', help='Directorio del snapshot')
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='restore: vaciar antes las tablas del dataset (se conservan los superusuarios)'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            if options['action'] == 'save':
+                manifest = datasets.save_snapshot(options['path'])
+            else:
+                manifest = datasets.restore_snapshot(options['path'], replace=options['replace'])
+        except datasets.SnapshotError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - start
+
+        for table, saved in manifest['tables'].items():
+            self.stdout.write(f'   ✓ {table}: {saved["rows"]:,} filas')
+        verb = 'guardado en' if options['action'] == 'save' else 'restaurado desde'
+        self.stdout.write(self.style.SUCCESS(
+            f'💾 Snapshot {verb} {options["path"]} en {elapsed:.1f} s (migración {manifest["schema"]})'
+        ))
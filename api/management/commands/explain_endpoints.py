@@ -0,0 +1,190 @@
+"""
+Django command to capture the query plans of the main API endpoints
+"""
+import json
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from api.models import Company, Customer
+
+# (nombre, url); los marcadores se completan con datos reales de la base
+ENDPOINTS = [
+    ('Clientes', '/api/customers/'),
+    ('Clientes de un representante', '/api/customers/?sales_rep_id={sales_rep}'),
+    ('Clientes por nombre', '/api/customers/?ordering=-last_name'),
+    ('Estadísticas de clientes', '/api/customers/stats/'),
+    ('Clientes desatendidos', '/api/customers/needs-attention/?sales_rep_id={sales_rep}'),
+    ('Detalle de cliente', '/api/customers/{customer}/'),
+    ('Dashboard', '/api/dashboard/'),
+    ('Compañías', '/api/companies/'),
+    ('Clientes de una compañía', '/api/companies/{company}/customers/'),
+    ('Usuarios', '/api/users/'),
+    ('Clientes de un usuario', '/api/users/{sales_rep}/customers/'),
+    ('Interacciones', '/api/interactions/'),
+    ('Interacciones por tipo', '/api/interactions/?interaction_type=Call'),
+    ('Interacciones de un cliente', '/api/interactions/?customer={customer}'),
+    ('Interacciones recientes', '/api/interactions/recent/'),
+    ('Histograma', '/api/interactions/histogram/?interval=week&date_from={month_ago}'),
+    ('Histograma agregado', '/api/interactions/histogram/?interval=week&source=rollup'),
+    ('Feed de cambios', '/api/changes/?since=latest'),
+]
+
+# Literales de una consulta, para agrupar las que solo difieren en parámetros (N+1)
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+# Lecturas de tablas de la aplicación; deja fuera set_config, los advisory
+# locks y las consultas al catálogo (reltuples del paginador)
+APP_READ = re.compile(r'^\s*(?:SELECT|WITH)\b.*\b(?:FROM|JOIN)\s+"api_', re.IGNORECASE | re.DOTALL)
+
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+class Command(BaseCommand):
+    """
+    Ejecuta las consultas de cada endpoint bajo EXPLAIN (ANALYZE, BUFFERS) y
+    señala los recorridos secuenciales y ordenamientos sobre tablas grandes.
+    Las consultas se ejecutan de verdad: usar contra una copia de los datos.
+    """
+
+    help = 'Captura los planes de las consultas de los endpoints principales y señala los problemas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            action='append',
+            dest='urls',
+            help='Analizar esta URL en lugar de la lista por defecto (repetible)'
+        )
+        parser.add_argument(
+            '--min-rows',
+            type=int,
+            default=10000,
+            help='Filas a partir de las cuales una tabla o un ordenamiento se considera grande (default: 10000)'
+        )
+        parser.add_argument(
+            '--output',
+            help='Guardar los planes completos en este archivo JSON'
+        )
+
+    def handle(self, *args, **options):
+        self.min_rows = options['min_rows']
+        self.table_rows = {}
+
+        if options['urls']:
+            endpoints = [(url, url) for url in options['urls']]
+        else:
+            endpoints = [(name, url.format(**self.sample_values())) for name, url in ENDPOINTS]
+
+        client = Client()
+        captured_plans = []
+        total_flags = 0
+
+        # Sin caché para que el dashboard ejecute sus consultas
+        with override_settings(
+            ALLOWED_HOSTS=['*'],
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+        ):
+            for name, url in endpoints:
+                with CaptureQueriesContext(connection) as captured:
+                    response = client.get(url)
+                queries = [
+                    query['sql'] for query in captured.captured_queries
+                    if APP_READ.match(query['sql'])
+                ]
+                self.stdout.write(
+                    f'\n📊 {name}  GET {url}  → {response.status_code}, {len(queries)} consultas'
+                )
+
+                for sql, repeated in self.group_queries(queries):
+                    plan = self.explain(sql)
+                    flags = self.flags(plan['Plan'])
+                    total_flags += len(flags)
+                    captured_plans.append({'endpoint': name, 'url': url, 'sql': sql, 'plan': plan})
+
+                    marker = '✗' if flags else '✓'
+                    times = f' ×{repeated}' if repeated > 1 else ''
+                    self.stdout.write(
+                        f'   {marker} {plan["Execution Time"]:8.2f} ms{times}  {sql[:100]}'
+                    )
+                    for flag in flags:
+                        self.stdout.write(self.style.WARNING(f'        {flag}'))
+                    if repeated > 1:
+                        self.stdout.write(self.style.WARNING(
+                            f'        Consulta repetida {repeated} veces (N+1)'
+                        ))
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(captured_plans, output, indent=2, default=str)
+            self.stdout.write(f'\n💾 Planes guardados en {options["output"]}')
+
+        if total_flags:
+            self.stdout.write(self.style.WARNING(f'\n{total_flags} problemas encontrados'))
+        else:
+            self.stdout.write(self.style.SUCCESS('\nSin recorridos secuenciales ni ordenamientos grandes'))
+
+    def sample_values(self):
+        """Ids reales para completar las URLs de detalle y filtros"""
+        customer = Customer.objects.exclude(sales_rep=None).values('id', 'sales_rep_id').first()
+        company = Company.objects.values_list('id', flat=True).first()
+        if customer is None or company is None:
+            raise CommandError('No hay datos: ejecuta generate_fake_data antes de analizar')
+        return {
+            'customer': customer['id'],
+            'sales_rep': customer['sales_rep_id'],
+            'company': company,
+            'month_ago': (timezone.localdate() - timedelta(days=30)).isoformat(),
+        }
+
+    def group_queries(self, queries):
+        """Consultas distintas (la primera de cada forma) y cuántas veces se repite cada forma"""
+        groups = {}
+        for sql in queries:
+            shape = LITERALS.sub('?', sql)
+            if shape in groups:
+                groups[shape][1] += 1
+            else:
+                groups[shape] = [sql, 1]
+        return [tuple(group) for group in groups.values()]
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}')
+            return cursor.fetchone()[0][0]
+
+    def rows_in(self, table):
+        """Filas estimadas de la tabla según pg_class.reltuples"""
+        if table not in self.table_rows:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+                row = cursor.fetchone()
+                self.table_rows[table] = row[0] if row else 0
+        return self.table_rows[table]
+
+    def flags(self, plan):
+        """Recorridos secuenciales sobre tablas grandes y ordenamientos de muchas filas"""
+        flags = []
+        for node in plan_nodes(plan):
+            if node['Node Type'] == 'Seq Scan':
+                rows = self.rows_in(node['Relation Name'])
+                if rows >= self.min_rows:
+                    flags.append(f'Seq Scan en {node["Relation Name"]} (≈{rows:,} filas)')
+            elif node['Node Type'] in ('Sort', 'Incremental Sort'):
+                sorted_rows = sum(
+                    child.get('Actual Rows', 0) * child.get('Actual Loops', 1)
+                    for child in node.get('Plans', [])
+                )
+                method = node.get('Sort Method', '')
+                if sorted_rows >= self.min_rows or 'external' in method:
+                    keys = ', '.join(node.get('Sort Key', []))
+                    flags.append(f'Sort de {sorted_rows:,} filas por {keys} ({method})')
+        return flags
@@ -0,0 +1,74 @@
+"""
+Django command to profile module import times when the application boots
+"""
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Arranque igual que gunicorn: importar la aplicación y precalentarla
+BOOT_CODE = 'from testingpython.wsgi import create_application; create_application()'
+
+# import time: self [us] | cumulative | imported package
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+class Command(BaseCommand):
+    """Arranca la aplicación en un proceso nuevo con python -X importtime y resume los tiempos"""
+
+    help = 'Muestra los módulos y paquetes que más tardan en importarse al arrancar la aplicación'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=20,
+            help='Número de módulos a mostrar (default: 20)'
+        )
+        parser.add_argument(
+            '--sort',
+            choices=['cumulative', 'self'],
+            default='cumulative',
+            help='Ordenar por tiempo acumulado (incluye submódulos) o propio (default: cumulative)'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_CODE],
+            capture_output=True, text=True, env=os.environ.copy(),
+        )
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode:
+            raise CommandError(f'El arranque falló:\n{result.stderr[-2000:]}')
+
+        modules = []
+        for line in result.stderr.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                own, cumulative, indent, name = match.groups()
+                modules.append((name, int(own) / 1000, int(cumulative) / 1000, len(indent) // 2))
+
+        packages = Counter()
+        for name, own, cumulative, depth in modules:
+            packages[name.split('.')[0]] += own
+        total_imports = sum(packages.values())
+
+        key = 2 if options['sort'] == 'cumulative' else 1
+        slowest = sorted(modules, key=lambda row: row[key], reverse=True)[:options['limit']]
+        self.stdout.write(f'\n🐢 Módulos más lentos ({options["sort"]}):')
+        for name, own, cumulative, depth in slowest:
+            self.stdout.write(f'   {cumulative:9.1f} ms acumulado  {own:8.1f} ms propio  {name}')
+
+        self.stdout.write('\n📦 Paquetes (tiempo propio de todos sus módulos):')
+        for package, own in packages.most_common(options['limit']):
+            self.stdout.write(f'   {own:9.1f} ms  {package}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n{len(modules):,} módulos importados en {total_imports:.0f} ms; '
+            f'arranque completo (con precalentamiento) {elapsed:.0f} ms'
+        ))
@@ -0,0 +1,18 @@
+"""
+Django command to rebuild the CustomerInteractionSummary table
+"""
+from django.core.management.base import BaseCommand
+
+from api import summaries
+
+
+class Command(BaseCommand):
+    """Recalcula los resúmenes por cliente desde las tablas de interacciones"""
+
+    help = 'Reconstruye los resúmenes de interacciones por cliente (tras cargas masivas o archivados)'
+
+    def handle(self, *args, **options):
+        created = summaries.rebuild_all(
+            progress=lambda done: self.stdout.write(f'   ✓ {done:,} clientes procesados')
+        )
+        self.stdout.write(self.style.SUCCESS(f'Resúmenes reconstruidos: {created:,} clientes con interacciones'))
@@ -0,0 +1,65 @@
+"""
+Django command to refresh the InteractionDailyRollup aggregate table
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api import rollups
+
+
+class Command(BaseCommand):
+    """Reconstruye solo los días cuyo agregado no coincide con la tabla cruda"""
+
+    help = 'Refresca la tabla agregada de interacciones procesando solo los días modificados'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Número de días hacia atrás a revisar (default: 30)'
+        )
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            help='Revisar desde esta fecha (YYYY-MM-DD) en lugar de usar --days'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Reconstruir la tabla completa'
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Solo comprobar la consistencia contra la tabla cruda, sin escribir'
+        )
+
+    def handle(self, *args, **options):
+        if options['full']:
+            created = rollups.rebuild_all(
+                progress=lambda done: self.stdout.write(f'   ✓ {done:,} clientes procesados')
+            )
+            self.stdout.write(self.style.SUCCESS(f'Tabla reconstruida: {created:,} filas'))
+            return
+
+        end = timezone.localdate()
+        start = options['since'] or end - timedelta(days=options['days'])
+
+        if options['check']:
+            totals = rollups.stale_days(start, end)
+            stale = sorted(totals)
+            for day in stale:
+                raw, rolled = totals[day]
+                self.stdout.write(f'   ✗ {day}: {raw:,} interacciones, {rolled:,} agregadas')
+            if stale:
+                raise CommandError(f'{len(stale)} días inconsistentes entre {start} y {end}')
+            self.stdout.write(self.style.SUCCESS(f'Agregado consistente entre {start} y {end}'))
+            return
+
+        stale = rollups.refresh_stale_days(
+            start, end, progress=lambda done, total, day: self.stdout.write(f'   ✓ {day}')
+        )
+        self.stdout.write(self.style.SUCCESS(f'{len(stale)} días actualizados entre {start} y {end}'))
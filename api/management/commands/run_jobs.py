@@ -0,0 +1,59 @@
+"""
+Django command to run background jobs from the Job table
+"""
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api import jobs
+
+
+class Command(BaseCommand):
+    """Worker de la cola de trabajos: reclama y ejecuta trabajos hasta ser detenido"""
+
+    help = 'Ejecuta los trabajos en segundo plano encolados en la tabla Job'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Salir cuando no queden trabajos pendientes'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Segundos de espera cuando la cola está vacía (default: 2)'
+        )
+        parser.add_argument(
+            '--kinds',
+            nargs='*',
+            default=None,
+            help='Ejecutar solo estos tipos de trabajo'
+        )
+
+    def handle(self, *args, **options):
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        self.stdout.write(f'⚙️  Worker {worker_id} esperando trabajos ({", ".join(sorted(jobs.registry))})')
+
+        try:
+            while True:
+                close_old_connections()
+                claimed = jobs.claim(worker_id, options['kinds'])
+                if claimed is None:
+                    for scheduled in jobs.schedule_periodic():
+                        self.stdout.write(f'   ⏰ {scheduled.kind} programado para {scheduled.run_after:%Y-%m-%d %H:%M}')
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                self.stdout.write(f'   → {claimed.kind} {claimed.pk} (intento {claimed.attempts})')
+                jobs.run(claimed)
+                style = self.style.SUCCESS if claimed.status == claimed.Status.SUCCEEDED else self.style.WARNING
+                self.stdout.write(style(f'   ✓ {claimed.kind} {claimed.pk}: {claimed.status}'))
+        except KeyboardInterrupt:
+            self.stdout.write('Worker detenido')
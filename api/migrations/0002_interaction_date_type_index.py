@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:32
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='interaction',
+            index=models.Index(fields=['interaction_date', 'interaction_type'], name='interaction_date_type_idx'),
+        ),
+    ]
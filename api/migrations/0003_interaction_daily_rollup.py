@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_interaction_date_type_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InteractionDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('interaction_type', models.CharField(choices=[('Call', 'Call'), ('Email', 'Email'), ('SMS', 'SMS'), ('Meeting', 'Meeting'), ('Facebook', 'Facebook'), ('LinkedIn', 'LinkedIn'), ('WhatsApp', 'WhatsApp'), ('Phone', 'Phone')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='interaction_rollups', to='api.customer')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'interaction_type'], name='interaction_rollup_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('customer', 'day', 'interaction_type'), name='interaction_rollup_unique')],
+            },
+        ),
+    ]
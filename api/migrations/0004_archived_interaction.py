@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_interaction_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedInteraction',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('interaction_type', models.CharField(choices=[('Call', 'Call'), ('Email', 'Email'), ('SMS', 'SMS'), ('Meeting', 'Meeting'), ('Facebook', 'Facebook'), ('LinkedIn', 'LinkedIn'), ('WhatsApp', 'WhatsApp'), ('Phone', 'Phone')], max_length=20)),
+                ('notes', models.TextField(blank=True)),
+                ('interaction_date', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_interactions', to='api.customer')),
+            ],
+            options={
+                'ordering': ['-interaction_date'],
+                'indexes': [models.Index(fields=['customer', '-interaction_date'], name='archived_customer_date_idx'), models.Index(fields=['interaction_date'], name='archived_date_idx')],
+            },
+        ),
+    ]
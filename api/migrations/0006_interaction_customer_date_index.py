@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('api', '0005_change_log'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='interaction',
+            index=models.Index(fields=['customer', '-interaction_date'], name='interaction_customer_date_idx'),
+        ),
+    ]
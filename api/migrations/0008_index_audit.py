@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:50
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('api', '0007_job'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='customer',
+            index=models.Index(fields=['first_name', 'last_name'], name='customer_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='customer',
+            index=models.Index(fields=['company', 'first_name', 'last_name'], name='customer_company_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='customer',
+            index=models.Index(fields=['sales_rep', 'first_name', 'last_name'], name='customer_rep_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='interaction',
+            index=models.Index(fields=['interaction_type', 'interaction_date'], name='interaction_type_date_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_index_audit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerInteractionSummary',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='interaction_summary', serialize=False, to='api.customer')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('counts', models.JSONField(default=dict)),
+                ('last_by_type', models.JSONField(default=dict)),
+                ('first_interaction_at', models.DateTimeField(blank=True, null=True)),
+                ('last_interaction_at', models.DateTimeField(blank=True, null=True)),
+                ('last_interaction_type', models.CharField(blank=True, max_length=20)),
+                ('recent_activity', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Customer interaction summaries',
+            },
+        ),
+    ]
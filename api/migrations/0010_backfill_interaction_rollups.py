@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.db import migrations, transaction
+
+BATCH_SIZE = 200
+
+
+def customer_batches(connection):
+    last = None
+    with connection.cursor() as cursor:
+        while True:
+            if last is None:
+                cursor.execute('SELECT id FROM api_customer ORDER BY id LIMIT %s', [BATCH_SIZE])
+            else:
+                cursor.execute(
+                    'SELECT id FROM api_customer WHERE id > %s ORDER BY id LIMIT %s', [last, BATCH_SIZE]
+                )
+            batch = [row[0] for row in cursor.fetchall()]
+            if not batch:
+                return
+            yield batch
+            last = batch[-1]
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Recalcula los contadores diarios de toda la historia (activas y
+    archivadas). Un lote de clientes por transacción, con los clientes
+    bloqueados para que las altas concurrentes esperen al lote.
+    """
+    connection = schema_editor.connection
+    for batch in customer_batches(connection):
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute('SELECT id FROM api_customer WHERE id = ANY(%s) ORDER BY id FOR UPDATE', [batch])
+            cursor.execute('DELETE FROM api_interactiondailyrollup WHERE customer_id = ANY(%s)', [batch])
+            cursor.execute(
+                """
+                INSERT INTO api_interactiondailyrollup (customer_id, day, interaction_type, count)
+                SELECT customer_id, (interaction_date AT TIME ZONE %s)::date, interaction_type, count(*)
+                FROM (
+                    SELECT customer_id, interaction_date, interaction_type
+                    FROM api_interaction WHERE customer_id = ANY(%s)
+                    UNION ALL
+                    SELECT customer_id, interaction_date, interaction_type
+                    FROM api_archivedinteraction WHERE customer_id = ANY(%s)
+                ) AS interactions
+                GROUP BY 1, 2, 3
+                ORDER BY 1, 2, 3
+                """,
+                [settings.TIME_ZONE, batch, batch]
+            )
+
+
+class Migration(migrations.Migration):
+    # Una transacción por lote: una sola transacción larga detendría el feed de cambios
+    atomic = False
+
+    dependencies = [
+        ('api', '0009_customer_interaction_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,111 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import migrations, transaction
+from django.utils import timezone
+
+BATCH_SIZE = 2000
+# Días de actividad reciente (summaries.ACTIVITY_DAYS al crear la migración)
+ACTIVITY_DAYS = 30
+
+
+def customer_batches(connection):
+    last = None
+    with connection.cursor() as cursor:
+        while True:
+            if last is None:
+                cursor.execute('SELECT id FROM api_customer ORDER BY id LIMIT %s', [BATCH_SIZE])
+            else:
+                cursor.execute(
+                    'SELECT id FROM api_customer WHERE id > %s ORDER BY id LIMIT %s', [last, BATCH_SIZE]
+                )
+            batch = [row[0] for row in cursor.fetchall()]
+            if not batch:
+                return
+            yield batch
+            last = batch[-1]
+
+
+def backfill_summaries(apps, schema_editor):
+    """
+    Crea los resúmenes de los clientes con interacciones (activas y
+    archivadas), con el mismo contenido que summaries.build. Un lote de
+    clientes por transacción, con los clientes bloqueados para que las altas
+    concurrentes esperen al lote.
+    """
+    connection = schema_editor.connection
+    tz = timezone.get_current_timezone()
+    today = timezone.localdate()
+    activity_from = timezone.make_aware(
+        datetime.combine(today - timedelta(days=ACTIVITY_DAYS - 1), time.min), tz
+    )
+    activity_to = timezone.make_aware(datetime.combine(today + timedelta(days=1), time.min), tz)
+
+    for batch in customer_batches(connection):
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute('SELECT id FROM api_customer WHERE id = ANY(%s) ORDER BY id FOR UPDATE', [batch])
+            cursor.execute('DELETE FROM api_customerinteractionsummary WHERE customer_id = ANY(%s)', [batch])
+            cursor.execute(
+                """
+                WITH interactions AS (
+                    SELECT customer_id, interaction_type, interaction_date
+                    FROM api_interaction WHERE customer_id = ANY(%(ids)s)
+                    UNION ALL
+                    SELECT customer_id, interaction_type, interaction_date
+                    FROM api_archivedinteraction WHERE customer_id = ANY(%(ids)s)
+                ), by_type AS (
+                    SELECT customer_id, interaction_type, count(*) AS total,
+                           min(interaction_date) AS first, max(interaction_date) AS last
+                    FROM interactions GROUP BY 1, 2
+                ), latest AS (
+                    SELECT DISTINCT ON (customer_id) customer_id, interaction_type
+                    FROM interactions ORDER BY customer_id, interaction_date DESC
+                ), by_day AS (
+                    SELECT customer_id, (interaction_date AT TIME ZONE %(tz)s)::date AS day, count(*) AS total
+                    FROM interactions
+                    WHERE interaction_date >= %(activity_from)s AND interaction_date < %(activity_to)s
+                    GROUP BY 1, 2
+                ), activity AS (
+                    SELECT customer_id, jsonb_object_agg(to_char(day, 'YYYY-MM-DD'), total) AS days
+                    FROM by_day GROUP BY 1
+                )
+                INSERT INTO api_customerinteractionsummary (
+                    customer_id, total, counts, last_by_type, first_interaction_at,
+                    last_interaction_at, last_interaction_type, recent_activity, updated_at
+                )
+                SELECT by_type.customer_id, sum(by_type.total),
+                       jsonb_object_agg(by_type.interaction_type, by_type.total),
+                       jsonb_object_agg(by_type.interaction_type, to_char(
+                           by_type.last AT TIME ZONE 'UTC',
+                           -- Mismo texto que datetime.isoformat()
+                           CASE WHEN extract(microseconds FROM by_type.last)::bigint %% 1000000 = 0
+                                THEN 'YYYY-MM-DD"T"HH24:MI:SS"+00:00"'
+                                ELSE 'YYYY-MM-DD"T"HH24:MI:SS.US"+00:00"' END
+                       )),
+                       min(by_type.first), max(by_type.last), latest.interaction_type,
+                       coalesce(activity.days, '{}'::jsonb), now()
+                FROM by_type
+                JOIN latest ON latest.customer_id = by_type.customer_id
+                LEFT JOIN activity ON activity.customer_id = by_type.customer_id
+                GROUP BY by_type.customer_id, latest.interaction_type, activity.days
+                """,
+                {
+                    'ids': batch,
+                    'tz': settings.TIME_ZONE,
+                    'activity_from': activity_from,
+                    'activity_to': activity_to,
+                }
+            )
+
+
+class Migration(migrations.Migration):
+    # Una transacción por lote: una sola transacción larga detendría el feed de cambios
+    atomic = False
+
+    dependencies = [
+        ('api', '0010_backfill_interaction_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:38
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_backfill_interaction_summaries'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='changelogentry',
+            name='txid',
+            field=models.BigIntegerField(db_default=django.db.models.expressions.RawSQL('pg_current_xact_id()::text::bigint', [], output_field=models.BigIntegerField()), editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_changelog_pg_current_xact_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changelogentry',
+            name='customer_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+    ]
@@ -1,8 +1,25 @@
 import uuid
 from django.db import models
+from django.db.models.expressions import RawSQL
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
 
+def time_ago(moment):
+    """Texto relativo ('3 days ago') para una fecha pasada"""
+    now = timezone.now()
+    diff = now - moment
+
+    if diff.days > 0:
+        return f"{diff.days} day{'s' if diff.days > 1 else ''} ago"
+    elif diff.seconds > 3600:
+        hours = diff.seconds // 3600
+        return f"{hours} hour{'s' if hours > 1 else ''} ago"
+    elif diff.seconds > 60:
+        minutes = diff.seconds // 60
+        return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
+    else:
+        return "Just now"
+
 class User(AbstractUser):
     """
     Modelo de usuario personalizado. Hereda de AbstractUser para incluir
@@ -64,6 +81,15 @@ class Customer(models.Model):
         """Retorna la última interacción del cliente"""
         return self.interactions.order_by('-interaction_date').first()
 
+    class Meta:
+        indexes = [
+            # Orden por defecto del listado de clientes
+            models.Index(fields=['first_name', 'last_name'], name='customer_name_idx'),
+            # Clientes de una compañía o representante en ese mismo orden
+            models.Index(fields=['company', 'first_name', 'last_name'], name='customer_company_name_idx'),
+            models.Index(fields=['sales_rep', 'first_name', 'last_name'], name='customer_rep_name_idx'),
+        ]
+
     def __str__(self):
         return self.full_name
 
@@ -87,26 +113,203 @@ class Interaction(models.Model):
     interaction_type = models.CharField(max_length=20, choices=InteractionType.choices)
     notes = models.TextField(blank=True)
     interaction_date = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-interaction_date']
+        indexes = [
+            # Series temporales por intervalo y tipo (histograma)
+            models.Index(fields=['interaction_date', 'interaction_type'], name='interaction_date_type_idx'),
+            # Última interacción por cliente y anti-join de clientes inactivos
+            models.Index(fields=['customer', '-interaction_date'], name='interaction_customer_date_idx'),
+            # Filtro por tipo con rango u orden por fecha
+            models.Index(fields=['interaction_type', 'interaction_date'], name='interaction_type_date_idx'),
+        ]
 
     @property
     def time_ago(self):
         """Retorna cuánto tiempo hace que fue la interacción"""
-        now = timezone.now()
-        diff = now - self.interaction_date
-
-        if diff.days > 0:
-            return f"{diff.days} day{'s' if diff.days > 1 else ''} ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours} hour{'s' if hours > 1 else ''} ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes} minute{'s' if minutes > 1 else ''} ago"
-        else:
-            return "Just now"
+        return time_ago(self.interaction_date)
+
+    def __str__(self):
+        return f"{self.interaction_type} with {self.customer.full_name} on {self.interaction_date.strftime('%Y-%m-%d')}"
+
+
+class ArchivedInteraction(models.Model):
+    """
+    Interacción antigua movida fuera de la tabla principal por el comando
+    archive_interactions. Conserva el id y los datos de la original.
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='archived_interactions')
+    interaction_type = models.CharField(max_length=20, choices=Interaction.InteractionType.choices)
+    notes = models.TextField(blank=True)
+    interaction_date = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-interaction_date']
+        indexes = [
+            models.Index(fields=['customer', '-interaction_date'], name='archived_customer_date_idx'),
+            models.Index(fields=['interaction_date'], name='archived_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.interaction_type} (archivada) on {self.interaction_date.strftime('%Y-%m-%d')}"
+
+
+class InteractionDailyRollup(models.Model):
+    """
+    Conteo diario de interacciones por cliente y tipo. Se mantiene de forma
+    incremental desde las escrituras de Interaction (ver api/signals.py) y se
+    puede reconstruir con el comando refresh_interaction_rollups.
+    """
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='interaction_rollups')
+    day = models.DateField()
+    interaction_type = models.CharField(max_length=20, choices=Interaction.InteractionType.choices)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['customer', 'day', 'interaction_type'], name='interaction_rollup_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['day', 'interaction_type'], name='interaction_rollup_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.interaction_type} ({self.count})"
+
+
+class CustomerInteractionSummary(models.Model):
+    """
+    Resumen precalculado de las interacciones (activas y archivadas) de un
+    cliente. Se mantiene de forma incremental desde las escrituras de
+    Interaction (ver api/summaries.py) y se puede reconstruir con el comando
+    rebuild_interaction_summaries.
+    """
+    customer = models.OneToOneField(
+        Customer, on_delete=models.CASCADE, primary_key=True, related_name='interaction_summary'
+    )
+    total = models.PositiveIntegerField(default=0)
+    # {tipo: número de interacciones}
+    counts = models.JSONField(default=dict)
+    # {tipo: fecha ISO de la última interacción de ese tipo}
+    last_by_type = models.JSONField(default=dict)
+    first_interaction_at = models.DateTimeField(null=True, blank=True)
+    last_interaction_at = models.DateTimeField(null=True, blank=True)
+    last_interaction_type = models.CharField(max_length=20, blank=True)
+    # {día ISO: número de interacciones} de los últimos summaries.ACTIVITY_DAYS días
+    recent_activity = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Customer interaction summaries"
+
+    def __str__(self):
+        return f"{self.total} interacciones de {self.customer_id}"
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Alta, modificación o baja de un registro sincronizable. Se escribe en la
+    misma transacción que el cambio (ver api/signals.py) y alimenta el feed
+    incremental /api/changes/.
+    """
+    class Action(models.TextChoices):
+        INSERT = 'insert', 'Insert'
+        UPDATE = 'update', 'Update'
+        DELETE = 'delete', 'Delete'
+
+    id = models.BigAutoField(primary_key=True)
+    # Transacción que escribió la entrada: el feed se ordena por (txid, id)
+    txid = models.BigIntegerField(
+        db_default=RawSQL('pg_current_xact_id()::text::bigint', [], output_field=models.BigIntegerField()),
+        editable=False,
+    )
+    model = models.CharField(max_length=20)
+    object_id = models.UUIDField()
+    action = models.CharField(max_length=10, choices=Action.choices)
+    # Cliente de la interacción borrada: las bajas no tienen datos con los que filtrar
+    customer_id = models.UUIDField(null=True, blank=True)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['txid', 'id']
+        indexes = [
+            models.Index(fields=['txid', 'id'], name='changelog_position_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.action} {self.model} {self.object_id}"
+
+
+class Job(models.Model):
+    """
+    Tarea pesada ejecutada fuera del ciclo de la petición por el comando
+    run_jobs. Los workers reclaman trabajos con SELECT ... FOR UPDATE SKIP
+    LOCKED, así que pueden ejecutarse varios en paralelo sin broker externo.
+    """
+    class Status(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        SUCCEEDED = 'succeeded', 'Succeeded'
+        FAILED = 'failed', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    progress = models.PositiveSmallIntegerField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=255, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # También sirve de latido: un trabajo en curso sin actualizar se considera abandonado
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['run_after'], name='job_queued_idx',
+                condition=models.Q(status='queued'),
+            ),
+            models.Index(
+                fields=['updated_at'], name='job_running_idx',
+                condition=models.Q(status='running'),
+            ),
+        ]
+
+    class Lost(Exception):
+        """Otro worker reclamó el trabajo (se consideró abandonado por falta de latido)"""
+
+    def owned(self):
+        """Queryset de la fila solo si este worker sigue siendo su dueño"""
+        return Job.objects.filter(pk=self.pk, status=Job.Status.RUNNING, locked_by=self.locked_by)
+
+    def report_progress(self, done, total=None, message=''):
+        """
+        Actualiza el progreso (0-100) y el latido sin tocar el resto de la fila.
+        Lanza Job.Lost si otro worker reclamó el trabajo: el manejador debe parar.
+        """
+        progress = min(100, int(done * 100 / total)) if total else self.progress
+        self.progress = progress
+        self.progress_message = message[:255]
+        self.updated_at = timezone.now()
+        updated = self.owned().update(
+            progress=self.progress,
+            progress_message=self.progress_message,
+            updated_at=self.updated_at,
+        )
+        if not updated:
+            raise Job.Lost(self.pk)
 
     def __str__(self):
-        return f"{self.interaction_type} with {self.customer.full_name} on {self.interaction_date.strftime('%Y-%m-%d')}"
\ No newline at end of file
+        return f"{self.kind} ({self.status})"
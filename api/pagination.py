@@ -0,0 +1,90 @@
+"""
+Paginación con conteo estimado para tablas grandes.
+
+El COUNT(*) exacto de un listado sin filtros (o con filtros poco selectivos)
+recorre la tabla completa y puede costar más que la propia página. Por encima
+de un umbral se usa la estimación del planificador de PostgreSQL.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+def estimated_count(queryset):
+    """
+    Filas estimadas por PostgreSQL para el queryset: pg_class.reltuples si no
+    tiene filtros, o el 'Plan Rows' de su EXPLAIN si los tiene. Retorna None
+    si no hay estadísticas (tabla nunca analizada).
+    """
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if not queryset.query.where and not queryset.query.distinct:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = queryset.order_by().query.sql_with_params()
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator que devuelve el conteo exacto por debajo de
+    exact_count_threshold y la estimación del planificador por encima.
+    count_is_estimate indica cuál se usó.
+
+    Como el planificador puede sobreestimar filtros muy selectivos (ILIKE),
+    antes de usar la estimación se cuenta con un LIMIT de exact_count_threshold
+    filas: si no se llega al umbral, ese conteo ya es exacto.
+    """
+    exact_count_threshold = getattr(settings, 'EXACT_COUNT_THRESHOLD', 10000)
+
+    def __init__(self, *args, exact_count_threshold=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if exact_count_threshold is not None:
+            self.exact_count_threshold = exact_count_threshold
+        self.count_is_estimate = False
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is None or estimate < self.exact_count_threshold:
+            return self.object_list.count()
+
+        capped = self.object_list.order_by()[:self.exact_count_threshold].count()
+        if capped < self.exact_count_threshold:
+            return capped
+
+        self.count_is_estimate = True
+        return max(estimate, capped)
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    PageNumberPagination con conteo estimado en listados grandes. La respuesta
+    incluye count_is_estimate para que el cliente muestre "aprox. 512.000".
+    Con un conteo estimado la última página puede quedar vacía o incompleta.
+    """
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_is_estimate': self.page.paginator.count_is_estimate,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_is_estimate'] = {'type': 'boolean', 'example': False}
+        return response_schema
@@ -0,0 +1,250 @@
+"""
+Mantenimiento de la tabla agregada InteractionDailyRollup.
+
+Las escrituras individuales de Interaction ajustan los contadores de forma
+incremental (ver api/signals.py). Las cargas masivas (bulk_create, update o
+delete sobre querysets) no disparan señales, por lo que el comando
+refresh_interaction_rollups compara los contadores (cliente, día, tipo) contra
+la tabla cruda y reconstruye únicamente los días que no cuadran.
+
+Las interacciones archivadas (ArchivedInteraction) siguen contando en los
+agregados: archivar mueve datos de tabla, no los elimina.
+"""
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ArchivedInteraction, Customer, Interaction, InteractionDailyRollup
+
+BATCH_SIZE = 5000
+# Clientes por transacción al reconstruir la tabla completa
+CUSTOMER_BATCH_SIZE = 200
+
+
+def rollup_day(value):
+    """Día (en la zona horaria activa) al que pertenece una fecha de interacción"""
+    return timezone.localdate(value)
+
+
+def bump(customer_id, day, interaction_type, delta):
+    """Suma delta al contador (cliente, día, tipo), creando la fila si no existe"""
+    lookup = {'customer_id': customer_id, 'day': day, 'interaction_type': interaction_type}
+    rollups = InteractionDailyRollup.objects.filter(**lookup)
+
+    if delta < 0:
+        # Nunca bajar de cero aunque la tabla esté desincronizada
+        rollups.filter(count__gte=-delta).update(count=F('count') + delta)
+        return
+
+    with transaction.atomic():
+        if rollups.update(count=F('count') + delta):
+            return
+        try:
+            with transaction.atomic():
+                InteractionDailyRollup.objects.create(count=delta, **lookup)
+        except IntegrityError:
+            # Otra transacción creó la fila entre el UPDATE y el INSERT
+            rollups.update(count=F('count') + delta)
+
+
+def subtract(counts):
+    """
+    Resta de una vez {(cliente, día, tipo): n}, con una sola sentencia por
+    lote, sin bajar de cero (ver bump). Para los borrados de varias
+    interacciones.
+    """
+    table = connection.ops.quote_name(InteractionDailyRollup._meta.db_table)
+    items = list(counts.items())
+    for offset in range(0, len(items), BATCH_SIZE):
+        batch = items[offset:offset + BATCH_SIZE]
+        values = ', '.join(['(%s::uuid, %s::date, %s, %s)'] * len(batch))
+        params = [
+            value
+            for (customer_id, day, interaction_type), count in batch
+            for value in (customer_id, day, interaction_type, count)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {table} AS r SET count = r.count - d.count
+                FROM (VALUES {values}) AS d (customer_id, day, interaction_type, count)
+                WHERE r.customer_id = d.customer_id AND r.day = d.day
+                  AND r.interaction_type = d.interaction_type AND r.count >= d.count
+                """,
+                params
+            )
+
+
+def _day_bounds(start, end):
+    """Rango [start, end] de días convertido a datetimes para usar el índice"""
+    tz = timezone.get_current_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, time.min), tz),
+        timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz),
+    )
+
+
+def _raw_by_day(model, start, end):
+    """Interacciones (activas o archivadas) de los días entre start y end"""
+    lower, upper = _day_bounds(start, end)
+    return (
+        model.objects
+        .filter(interaction_date__gte=lower, interaction_date__lt=upper)
+        .annotate(day=TruncDate('interaction_date'))
+        .order_by()
+    )
+
+
+def raw_counts(start, end):
+    """Conteos {(cliente, día, tipo): n} calculados sobre las tablas crudas"""
+    counts = Counter()
+    for model in (Interaction, ArchivedInteraction):
+        rows = (
+            _raw_by_day(model, start, end)
+            .values('customer_id', 'day', 'interaction_type')
+            .annotate(count=Count('id'))
+            .values_list('customer_id', 'day', 'interaction_type', 'count')
+        )
+        for customer_id, day, interaction_type, count in rows.iterator(chunk_size=BATCH_SIZE):
+            counts[(customer_id, day, interaction_type)] += count
+    return counts
+
+
+def rebuild_range(start, end):
+    """Reconstruye los contadores de los días entre start y end (inclusive)"""
+    counts = raw_counts(start, end)
+    with transaction.atomic():
+        InteractionDailyRollup.objects.filter(day__range=(start, end)).delete()
+        InteractionDailyRollup.objects.bulk_create(
+            (
+                InteractionDailyRollup(
+                    customer_id=customer_id, day=day, interaction_type=interaction_type, count=count
+                )
+                for (customer_id, day, interaction_type), count in counts.items()
+            ),
+            batch_size=BATCH_SIZE,
+        )
+    return len(counts)
+
+
+def customer_batches(batch_size):
+    """Ids de clientes en lotes ordenados por clave primaria, leídos por rango (keyset)"""
+    last = None
+    while True:
+        queryset = Customer.objects.order_by('pk')
+        if last is not None:
+            queryset = queryset.filter(pk__gt=last)
+        batch = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last = batch[-1]
+
+
+def lock_customers(customer_ids):
+    """
+    Bloquea los clientes hasta el final de la transacción: las altas de sus
+    interacciones (FOR KEY SHARE sobre el cliente) esperan a que se reconstruya
+    el lote. Retorna los ids que siguen existiendo.
+    """
+    return list(
+        Customer.objects.filter(pk__in=customer_ids)
+        .select_for_update()
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def rebuild_customers(customer_ids):
+    """Reconstruye toda la historia de los clientes dentro de la transacción actual"""
+    # Primero el DELETE: los ajustes concurrentes esperan a que confirmemos
+    InteractionDailyRollup.objects.filter(customer_id__in=customer_ids).delete()
+    counts = Counter()
+    for model in (Interaction, ArchivedInteraction):
+        rows = (
+            model.objects.filter(customer_id__in=customer_ids)
+            .annotate(day=TruncDate('interaction_date'))
+            .order_by()
+            .values('customer_id', 'day', 'interaction_type')
+            .annotate(count=Count('id'))
+            .values_list('customer_id', 'day', 'interaction_type', 'count')
+        )
+        for customer_id, day, interaction_type, count in rows.iterator(chunk_size=BATCH_SIZE):
+            counts[(customer_id, day, interaction_type)] += count
+
+    # Orden fijo: los mismos datos producen los mismos ids
+    InteractionDailyRollup.objects.bulk_create(
+        (
+            InteractionDailyRollup(
+                customer_id=customer_id, day=day, interaction_type=interaction_type, count=count
+            )
+            for (customer_id, day, interaction_type), count in sorted(counts.items())
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return len(counts)
+
+
+def rebuild_all(progress=None):
+    """
+    Reconstruye la tabla completa por lotes de clientes, cada lote en su propia
+    transacción: una transacción de minutos detendría el feed de cambios (ver
+    changes.visible_entries). progress(clientes_hechos) se llama tras cada lote.
+    Retorna el número de filas creadas.
+    """
+    created = done = 0
+    for batch in customer_batches(CUSTOMER_BATCH_SIZE):
+        with transaction.atomic():
+            created += rebuild_customers(lock_customers(batch))
+        done += len(batch)
+        if progress:
+            progress(done)
+    return created
+
+
+def rolled_counts(start, end):
+    """Conteos {(cliente, día, tipo): n} de la tabla agregada"""
+    rows = (
+        InteractionDailyRollup.objects
+        .filter(day__range=(start, end))
+        .values_list('customer_id', 'day', 'interaction_type', 'count')
+    )
+    return Counter({
+        (customer_id, day, interaction_type): count
+        for customer_id, day, interaction_type, count in rows.iterator(chunk_size=BATCH_SIZE)
+        if count
+    })
+
+
+def stale_days(start, end):
+    """
+    Días entre start y end con algún contador (cliente, día, tipo) distinto
+    del de las tablas crudas: {día: (total crudo, total agregado)}. Comparar
+    solo los totales diarios no detecta errores que se compensan, como una
+    interacción contada en otro cliente o tipo.
+    """
+    raw, rolled = raw_counts(start, end), rolled_counts(start, end)
+    stale = {key[1] for key in raw.keys() | rolled.keys() if raw[key] != rolled[key]}
+    raw_totals, rolled_totals = Counter(), Counter()
+    for counts, totals in ((raw, raw_totals), (rolled, rolled_totals)):
+        for (customer_id, day, interaction_type), count in counts.items():
+            totals[day] += count
+    return {day: (raw_totals[day], rolled_totals[day]) for day in stale}
+
+
+def refresh_stale_days(start, end, progress=None):
+    """
+    Reconstruye los días entre start y end con algún contador que no coincide
+    con las tablas crudas (ver stale_days). progress(hechos, total, día) se
+    llama tras cada día. Retorna la lista de días reconstruidos.
+    """
+    stale = sorted(stale_days(start, end))
+    for done, day in enumerate(stale, start=1):
+        rebuild_range(day, day)
+        if progress:
+            progress(done, len(stale), day)
+    return stale
@@ -1,54 +1,158 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.utils import timezone
-from datetime import datetime, timedelta
-from .models import User, Company, Customer, Interaction
+from .models import (
+    User, Company, Customer, Interaction, ArchivedInteraction, CustomerInteractionSummary, Job,
+    time_ago
+)
+from . import summaries
 
 
-class CompanySerializer(serializers.ModelSerializer):
+def _split_field_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def requested_fields(request, available):
+    """Campos pedidos con ?fields= / ?omit=, o None si se piden todos"""
+    if request is None or request.method != 'GET':
+        return None
+
+    fields = request.query_params.get('fields')
+    omit = request.query_params.get('omit')
+    if not fields and not omit:
+        return None
+
+    selected = set(available)
+    if fields:
+        selected &= _split_field_names(fields)
+    if omit:
+        selected -= _split_field_names(omit)
+    return selected
+
+
+class SparseFieldsetsMixin:
+    """
+    Permite recortar la salida con ?fields=id,full_name o ?omit=notes.
+    Meta.sparse_sources indica las columnas que lee cada campo que no es una
+    columna del modelo (una tupla vacía si solo depende de un prefetch), para
+    que las vistas puedan limitar el SELECT con .only().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = requested_fields(self.context.get('request'), self.fields)
+        if selected is not None:
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def sparse_only(cls, selected):
+        """Columnas necesarias para serializar los campos seleccionados"""
+        sources = getattr(cls.Meta, 'sparse_sources', {})
+        columns = {'id'}
+        for name in selected:
+            for path in sources.get(name, (name,)):
+                columns.add(path)
+                if '__' in path:
+                    # La FK también debe cargarse para poder seguir el select_related
+                    columns.add(path.split('__', 1)[0])
+        return sorted(columns)
+
+
+class CompanySerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     customer_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Company
         fields = ['id', 'name', 'customer_count', 'created_at']
+        sparse_sources = {'customer_count': ()}
 
     def get_customer_count(self, obj):
         return obj.customers.count()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     customer_count = serializers.SerializerMethodField()
 
     class Meta:
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'email', 'customer_count', 'is_admin']
+        sparse_sources = {'customer_count': ()}
 
     def get_customer_count(self, obj):
         return obj.customers.count()
 
 
-class InteractionSerializer(serializers.ModelSerializer):
+class InteractionSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     time_ago = serializers.ReadOnlyField()
 
     class Meta:
         model = Interaction
         fields = ['id', 'interaction_type', 'notes', 'interaction_date', 'time_ago']
+        sparse_sources = {'time_ago': ('interaction_date',)}
+
+
+class ArchivedInteractionSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    """Serializer de solo lectura para interacciones archivadas"""
+
+    class Meta:
+        model = ArchivedInteraction
+        fields = ['id', 'customer', 'interaction_type', 'notes', 'interaction_date', 'archived_at']
+
 
+class CustomerInteractionSummarySerializer(serializers.ModelSerializer):
+    """Resumen precalculado de interacciones de un cliente"""
+    recent_activity = serializers.SerializerMethodField()
 
-class CustomerListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CustomerInteractionSummary
+        fields = [
+            'total', 'counts', 'last_by_type', 'first_interaction_at',
+            'last_interaction_at', 'last_interaction_type', 'recent_activity'
+        ]
+
+    def get_recent_activity(self, obj):
+        return summaries.recent_activity(obj)
+
+
+# Columnas del resumen para .only() cuando se serializa interaction_summary
+SUMMARY_SOURCES = tuple(
+    f'interaction_summary__{name}' for name in CustomerInteractionSummarySerializer.Meta.fields
+)
+
+
+def get_interaction_summary(obj):
+    """Resumen del cliente o None si aún no tiene interacciones"""
+    summary = getattr(obj, 'interaction_summary', None)
+    return CustomerInteractionSummarySerializer(summary).data if summary else None
+
+
+class CustomerListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """Serializer optimizado para la lista de clientes"""
     full_name = serializers.ReadOnlyField()
     birthday_formatted = serializers.ReadOnlyField()
     company_name = serializers.CharField(source='company.name', read_only=True)
     sales_rep_name = serializers.SerializerMethodField()
     last_interaction_info = serializers.SerializerMethodField()
+    interaction_summary = serializers.SerializerMethodField()
 
     class Meta:
         model = Customer
         fields = [
             'id', 'full_name', 'email', 'birthday_formatted',
             'company_name', 'sales_rep_name', 'last_interaction_info',
-            'date_of_birth', 'created_at'
+            'interaction_summary', 'date_of_birth', 'created_at'
         ]
+        sparse_sources = {
+            'full_name': ('first_name', 'last_name'),
+            'birthday_formatted': ('date_of_birth',),
+            'company_name': ('company__name',),
+            'sales_rep_name': ('sales_rep__first_name', 'sales_rep__last_name', 'sales_rep__username'),
+            'last_interaction_info': (
+                'interaction_summary__last_interaction_at', 'interaction_summary__last_interaction_type'
+            ),
+            'interaction_summary': SUMMARY_SOURCES,
+        }
 
     def get_sales_rep_name(self, obj):
         if obj.sales_rep:
@@ -56,17 +160,43 @@ class CustomerListSerializer(serializers.ModelSerializer):
         return None
 
     def get_last_interaction_info(self, obj):
-        last_interaction = obj.last_interaction
-        if last_interaction:
+        # Del resumen precalculado: sin consultar la tabla de interacciones
+        summary = getattr(obj, 'interaction_summary', None)
+        if summary and summary.last_interaction_at:
             return {
-                'type': last_interaction.interaction_type,
-                'time_ago': last_interaction.time_ago,
-                'date': last_interaction.interaction_date
+                'type': summary.last_interaction_type,
+                'time_ago': time_ago(summary.last_interaction_at),
+                'date': summary.last_interaction_at
             }
         return None
 
+    def get_interaction_summary(self, obj):
+        return get_interaction_summary(obj)
+
+
+class CustomerAttentionSerializer(CustomerListSerializer):
+    """Serializer para clientes sin contacto reciente (usa la fecha anotada en la consulta)"""
+    last_interaction_at = serializers.DateTimeField(read_only=True)
+    days_inactive = serializers.SerializerMethodField()
+
+    class Meta(CustomerListSerializer.Meta):
+        fields = [
+            'id', 'full_name', 'email', 'company_name', 'sales_rep_name',
+            'last_interaction_at', 'days_inactive'
+        ]
+        sparse_sources = {
+            **CustomerListSerializer.Meta.sparse_sources,
+            'last_interaction_at': (),
+            'days_inactive': (),
+        }
+
+    def get_days_inactive(self, obj):
+        if obj.last_interaction_at is None:
+            return None
+        return (timezone.now() - obj.last_interaction_at).days
 
-class CustomerDetailSerializer(serializers.ModelSerializer):
+
+class CustomerDetailSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """Serializer detallado para un cliente específico"""
     full_name = serializers.ReadOnlyField()
     birthday_formatted = serializers.ReadOnlyField()
@@ -74,18 +204,30 @@ class CustomerDetailSerializer(serializers.ModelSerializer):
     sales_rep = UserSerializer(read_only=True)
     interactions = InteractionSerializer(many=True, read_only=True)
     interaction_count = serializers.SerializerMethodField()
+    interaction_summary = serializers.SerializerMethodField()
 
     class Meta:
         model = Customer
         fields = [
             'id', 'first_name', 'last_name', 'full_name', 'email',
             'date_of_birth', 'birthday_formatted', 'company', 'sales_rep',
-            'interactions', 'interaction_count', 'created_at', 'updated_at'
+            'interactions', 'interaction_count', 'interaction_summary',
+            'created_at', 'updated_at'
         ]
+        sparse_sources = {
+            'full_name': ('first_name', 'last_name'),
+            'birthday_formatted': ('date_of_birth',),
+            'interactions': (),
+            'interaction_count': (),
+            'interaction_summary': SUMMARY_SOURCES,
+        }
 
     def get_interaction_count(self, obj):
         return obj.interactions.count()
 
+    def get_interaction_summary(self, obj):
+        return get_interaction_summary(obj)
+
 
 class CustomerCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer para crear y actualizar clientes"""
@@ -117,3 +259,100 @@ class InteractionCreateSerializer(serializers.ModelSerializer):
         if value > timezone.now():
             raise serializers.ValidationError("La fecha de interacción no puede ser en el futuro.")
         return value
+
+
+class CustomerBulkReassignSerializer(serializers.Serializer):
+    """Serializer para reasignar clientes en bloque a otro representante"""
+    sales_rep = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), allow_null=True)
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False)
+    filters = serializers.DictField(child=serializers.CharField(), required=False, allow_empty=False)
+
+    def validate(self, attrs):
+        """Exigir ids o filtros para no reasignar todos los clientes por accidente"""
+        if not attrs.get('ids') and not attrs.get('filters'):
+            raise serializers.ValidationError("Indica 'ids' o 'filters' para seleccionar los clientes.")
+        return attrs
+
+
+class RefreshRollupsPayloadSerializer(serializers.Serializer):
+    full = serializers.BooleanField(default=False)
+    since = serializers.DateField(required=False)
+    days = serializers.IntegerField(min_value=1, max_value=3650, default=30)
+
+
+class ArchiveInteractionsPayloadSerializer(serializers.Serializer):
+    older_than_days = serializers.IntegerField(default=365)
+    batch_size = serializers.IntegerField(min_value=1, max_value=10000, default=1000)
+    sleep = serializers.FloatField(min_value=0, max_value=10, default=0.1)
+
+    def validate_older_than_days(self, value):
+        """No archivar interacciones recientes desde la API"""
+        if value < settings.ARCHIVE_MIN_AGE_DAYS:
+            raise serializers.ValidationError(
+                f"Solo se pueden archivar interacciones de más de {settings.ARCHIVE_MIN_AGE_DAYS} días."
+            )
+        return value
+
+
+class PruneChangesPayloadSerializer(serializers.Serializer):
+    retention_days = serializers.IntegerField(min_value=1, required=False)
+
+
+class ExportCustomersPayloadSerializer(serializers.Serializer):
+    filters = serializers.DictField(child=serializers.CharField(), default=dict)
+
+    def validate_filters(self, value):
+        """Los mismos filtros que /api/customers/"""
+        from .views import CustomerFilter
+
+        filterset = CustomerFilter(value)
+        if not filterset.is_valid():
+            raise serializers.ValidationError(filterset.errors)
+        return value
+
+
+class EmptyPayloadSerializer(serializers.Serializer):
+    pass
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer para encolar trabajos y consultar su estado"""
+
+    # Tipo de trabajo -> serializer que valida su payload
+    payload_serializers = {
+        'refresh_rollups': RefreshRollupsPayloadSerializer,
+        'archive_interactions': ArchiveInteractionsPayloadSerializer,
+        'rebuild_summaries': EmptyPayloadSerializer,
+        'prune_changes': PruneChangesPayloadSerializer,
+        'export_customers': ExportCustomersPayloadSerializer,
+    }
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'payload', 'status', 'attempts', 'max_attempts',
+            'progress', 'progress_message', 'result', 'error', 'run_after',
+            'started_at', 'finished_at', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'status', 'attempts', 'progress', 'progress_message', 'result',
+            'error', 'started_at', 'finished_at', 'created_at', 'updated_at'
+        ]
+
+    def validate_kind(self, value):
+        """Validar que exista un manejador para el tipo de trabajo"""
+        from .jobs import registry
+
+        if value not in registry:
+            raise serializers.ValidationError(
+                f"Tipo de trabajo desconocido. Opciones: {', '.join(sorted(registry))}."
+            )
+        return value
+
+    def validate(self, attrs):
+        """Validar el payload según el tipo; se guarda normalizado y con los valores por defecto"""
+        payload = self.payload_serializers[attrs['kind']](data=attrs.get('payload', {}))
+        if not payload.is_valid():
+            raise serializers.ValidationError({'payload': payload.errors})
+        attrs['payload'] = dict(payload.data)
+        return attrs
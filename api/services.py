@@ -0,0 +1,148 @@
+"""
+Operaciones de negocio que actúan sobre muchos registros a la vez.
+"""
+import time
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.utils import OperationalError
+from django.utils import timezone
+from psycopg.errors import LockNotAvailable
+
+from . import changes
+from .models import ArchivedInteraction, ChangeLogEntry, Customer, Interaction
+from .signals import customers_reassigned
+
+
+def reassign_customers(queryset, sales_rep):
+    """
+    Asigna los clientes del queryset a sales_rep (None los deja sin
+    representante) con un único UPDATE: el queryset va como subconsulta y el
+    RETURNING da los ids y el representante anterior de los que cambiaron.
+    Envía customers_reassigned una sola vez con todos los clientes afectados.
+    """
+    table = Customer._meta.db_table
+    sales_rep_id = sales_rep.pk if sales_rep else None
+    selected, params = queryset.order_by().values('pk').query.get_compiler(connection=connection).as_sql()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # El CTE bloquea las filas y lee el representante después del bloqueo
+        cursor.execute(f"""
+            WITH target AS (
+                SELECT id, sales_rep_id FROM {table}
+                WHERE id IN ({selected}) AND sales_rep_id IS DISTINCT FROM %s
+                FOR UPDATE
+            )
+            UPDATE {table} AS customer
+            SET sales_rep_id = %s, updated_at = %s
+            FROM target
+            WHERE customer.id = target.id
+            RETURNING customer.id, target.sales_rep_id
+        """, [*params, sales_rep_id, sales_rep_id, timezone.now()])
+        rows = cursor.fetchall()
+
+        customer_ids = [customer_id for customer_id, _ in rows]
+        previous_counts = Counter(previous_rep_id for _, previous_rep_id in rows)
+        if customer_ids:
+            customers_reassigned.send(
+                sender=Customer,
+                customer_ids=customer_ids,
+                sales_rep=sales_rep,
+                previous_counts=dict(previous_counts),
+            )
+
+    return {
+        'updated': len(customer_ids),
+        'sales_rep': sales_rep_id,
+        'previous_sales_reps': [
+            {'sales_rep': rep_id, 'count': count}
+            for rep_id, count in previous_counts.items()
+        ],
+    }
+
+
+def archive_interactions_batch(cutoff, batch_size, lock_timeout_ms=2000):
+    """
+    Mueve a ArchivedInteraction hasta batch_size interacciones anteriores a
+    cutoff en una sola sentencia (DELETE ... RETURNING + INSERT) dentro de su
+    propia transacción, y registra sus bajas en el registro de cambios. Las
+    filas bloqueadas por otras transacciones se saltan, así que se puede
+    interrumpir y volver a ejecutar en cualquier momento.
+    El borrado no pasa por el ORM: los agregados siguen contando las archivadas.
+    Las interacciones cuyo id ya está en el archivo no se seleccionan (ver
+    archive_conflicts): se quedan donde están en lugar de bloquear el archivado.
+    Retorna el número de interacciones movidas.
+    """
+    hot = Interaction._meta.db_table
+    archive = ArchivedInteraction._meta.db_table
+    changelog = ChangeLogEntry._meta.db_table
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        # No esperar detrás de escrituras de usuarios: mejor reintentar en el siguiente lote
+        cursor.execute('SET LOCAL lock_timeout = %s', [f'{int(lock_timeout_ms)}ms'])
+        cursor.execute(f"""
+            WITH batch AS (
+                SELECT id FROM {hot} AS hot
+                WHERE interaction_date < %s
+                  AND NOT EXISTS (SELECT 1 FROM {archive} AS archived WHERE archived.id = hot.id)
+                ORDER BY interaction_date
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            ), moved AS (
+                DELETE FROM {hot} AS hot USING batch
+                WHERE hot.id = batch.id
+                RETURNING hot.id, hot.customer_id, hot.interaction_type, hot.notes, hot.interaction_date
+            ), logged AS (
+                INSERT INTO {changelog} (model, object_id, action, customer_id, changed_at)
+                SELECT %s, id, %s, customer_id, now() FROM moved
+            )
+            INSERT INTO {archive} (id, customer_id, interaction_type, notes, interaction_date, archived_at)
+            SELECT id, customer_id, interaction_type, notes, interaction_date, now() FROM moved
+        """, [cutoff, batch_size, 'interaction', ChangeLogEntry.Action.DELETE])
+        moved = cursor.rowcount
+        if moved:
+            cursor.execute('SELECT pg_notify(%s, %s)', [changes.NOTIFY_CHANNEL, 'interaction'])
+        return moved
+
+
+def archive_conflicts(cutoff):
+    """Interacciones anteriores a cutoff que no se pueden archivar porque su id ya está en el archivo"""
+    return Interaction.objects.filter(
+        interaction_date__lt=cutoff,
+        pk__in=ArchivedInteraction.objects.values('pk'),
+    )
+
+
+def archive_interactions(cutoff, batch_size=1000, sleep=0.1, max_batches=None, progress=None,
+                         max_lock_retries=5):
+    """
+    Archiva por lotes todas las interacciones anteriores a cutoff, con una
+    pausa de sleep segundos entre lotes. Un lote que no obtiene los bloqueos a
+    tiempo se reintenta tras una pausa, hasta max_lock_retries veces seguidas;
+    cualquier otro error se propaga. progress(total_movidas, lotes) se llama
+    después de cada lote. Retorna (total_movidas, lotes).
+    """
+    total = 0
+    batches = 0
+    lock_retries = 0
+    while max_batches is None or batches < max_batches:
+        batches += 1
+        try:
+            moved = archive_interactions_batch(cutoff, batch_size)
+        except OperationalError as exc:
+            # Solo lock_timeout: otra transacción tiene bloqueadas las filas
+            if not isinstance(exc.__cause__, LockNotAvailable) or lock_retries >= max_lock_retries:
+                raise
+            lock_retries += 1
+            time.sleep(max(sleep, 1))
+            continue
+        lock_retries = 0
+
+        if not moved:
+            break
+        total += moved
+        if progress:
+            progress(total, batches)
+        time.sleep(sleep)
+
+    return total, batches
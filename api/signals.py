@@ -0,0 +1,222 @@
+"""
+Señales propias de la aplicación y receptores que mantienen las tablas
+derivadas (agregados y resúmenes de Interaction, registro de cambios e
+índice de autocompletado).
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from . import autocomplete, changes, rollups, summaries
+from .models import ChangeLogEntry, Interaction, User
+
+# Se envía una sola vez por reasignación masiva (ver services.reassign_customers)
+# con sender=Customer, customer_ids, sales_rep y previous_counts
+# ({sales_rep_id anterior: número de clientes}).
+customers_reassigned = Signal()
+
+
+def _rollup_key(customer_id, interaction_date, interaction_type):
+    return (customer_id, rollups.rollup_day(interaction_date), interaction_type)
+
+
+def _origin_model(origin):
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def _is_single(instance, origin):
+    """
+    Borrado de solo esta fila (instance.delete()). Un queryset o una cascada
+    envían una señal por fila: ese trabajo se acumula en el origen del borrado
+    y se hace de una vez (Collector envía todos los pre_delete antes del
+    primer post_delete).
+    """
+    return origin is None or origin is instance
+
+
+def _pending(origin, name, default):
+    """Trabajo acumulado en el origen (instancia o queryset) de un borrado múltiple"""
+    return origin.__dict__.setdefault(name, default)
+
+
+@receiver(pre_save, sender=Interaction)
+def remember_previous_interaction(sender, instance, raw=False, **kwargs):
+    """Guarda los valores previos para poder ajustar los contadores al editar"""
+    instance._previous_values = None
+    if raw or instance._state.adding:
+        return
+
+    instance._previous_values = (
+        Interaction.objects
+        .filter(pk=instance.pk)
+        .values_list('customer_id', 'interaction_date', 'interaction_type')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Interaction)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    """Mantiene InteractionDailyRollup al crear o editar una interacción"""
+    if raw:
+        return
+
+    key = _rollup_key(instance.customer_id, instance.interaction_date, instance.interaction_type)
+    previous = getattr(instance, '_previous_values', None)
+    if previous is not None:
+        previous = _rollup_key(*previous)
+
+    if created or previous is None:
+        rollups.bump(*key, 1)
+    elif previous != key:
+        rollups.bump(*previous, -1)
+        rollups.bump(*key, 1)
+
+
+@receiver(pre_delete, sender=Interaction)
+def collect_rollup_deletes(sender, instance, origin=None, **kwargs):
+    """
+    Acumula los contadores de un borrado de varias interacciones. En una
+    cascada desde el cliente o su compañía no hay nada que restar: sus
+    agregados se borran con el cliente (CASCADE).
+    """
+    if _is_single(instance, origin) or _origin_model(origin) is not Interaction:
+        return
+    key = _rollup_key(instance.customer_id, instance.interaction_date, instance.interaction_type)
+    _pending(origin, '_rollup_deletes', Counter())[key] += 1
+
+
+@receiver(post_delete, sender=Interaction)
+def update_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    """Descuenta la interacción eliminada (o todas las del borrado) de InteractionDailyRollup"""
+    if _is_single(instance, origin):
+        rollups.bump(
+            *_rollup_key(instance.customer_id, instance.interaction_date, instance.interaction_type),
+            -1
+        )
+        return
+    pending = origin.__dict__.pop('_rollup_deletes', None)
+    if pending:
+        rollups.subtract(pending)
+
+
+@receiver(post_save, sender=Interaction)
+def update_summary_on_save(sender, instance, created, raw=False, **kwargs):
+    """Mantiene CustomerInteractionSummary al crear o editar una interacción"""
+    if raw:
+        return
+
+    current = (instance.customer_id, instance.interaction_date, instance.interaction_type)
+    previous = getattr(instance, '_previous_values', None)
+
+    if created or previous is None:
+        summaries.add(*current)
+    elif previous != current:
+        summaries.remove(*previous)
+        summaries.add(*current)
+
+
+@receiver(pre_delete, sender=Interaction)
+def collect_summary_deletes(sender, instance, origin=None, **kwargs):
+    """
+    Anota las filas y los clientes de un borrado de varias interacciones. En
+    una cascada desde el cliente o su compañía no hay nada que mantener: el
+    resumen se borra con el cliente (CASCADE).
+    """
+    if _is_single(instance, origin) or _origin_model(origin) is not Interaction:
+        return
+    remaining, customer_ids = _pending(origin, '_summary_deletes', (set(), set()))
+    remaining.add(instance.pk)
+    customer_ids.add(instance.customer_id)
+
+
+@receiver(post_delete, sender=Interaction)
+def update_summary_on_delete(sender, instance, origin=None, **kwargs):
+    """
+    Descuenta la interacción eliminada del resumen de su cliente. En un borrado
+    múltiple, tras la última fila, reconstruye de una vez los resúmenes de los
+    clientes afectados.
+    """
+    if _is_single(instance, origin):
+        summaries.remove(instance.customer_id, instance.interaction_date, instance.interaction_type)
+        return
+    pending = origin.__dict__.get('_summary_deletes')
+    if pending is None:
+        return
+    remaining, customer_ids = pending
+    remaining.discard(instance.pk)
+    if not remaining:
+        del origin._summary_deletes
+        summaries.rebuild(customer_ids)
+
+
+def record_save(sender, instance, created, raw=False, **kwargs):
+    """Registra el alta o modificación en el registro de cambios"""
+    if raw:
+        return
+    action = ChangeLogEntry.Action.INSERT if created else ChangeLogEntry.Action.UPDATE
+    changes.record(sender._meta.model_name, [instance.pk], action)
+
+
+def collect_deletes(sender, instance, origin=None, **kwargs):
+    """Acumula las bajas de un borrado múltiple (queryset o cascada)"""
+    if not _is_single(instance, origin):
+        deleted = _pending(origin, '_changelog_deletes', {}).setdefault(sender._meta.model_name, {})
+        deleted[instance.pk] = getattr(instance, 'customer_id', None)
+
+
+def record_delete(sender, instance, origin=None, **kwargs):
+    """
+    Registra la baja (tombstone) con el cliente de la interacción, o todas las
+    del borrado con una consulta por modelo.
+    """
+    if _is_single(instance, origin):
+        deleted = {sender._meta.model_name: {instance.pk: getattr(instance, 'customer_id', None)}}
+    else:
+        deleted = origin.__dict__.pop('_changelog_deletes', {})
+    for model, customer_ids in deleted.items():
+        changes.record(model, list(customer_ids), ChangeLogEntry.Action.DELETE, customer_ids)
+
+
+for _name, (_model, _fields) in changes.TRACKED_MODELS.items():
+    post_save.connect(record_save, sender=_model, dispatch_uid=f'changelog_save_{_name}')
+    pre_delete.connect(collect_deletes, sender=_model, dispatch_uid=f'changelog_collect_{_name}')
+    post_delete.connect(record_delete, sender=_model, dispatch_uid=f'changelog_delete_{_name}')
+
+
+def update_autocomplete_on_save(sender, instance, raw=False, **kwargs):
+    """Reindexa el nombre en el autocompletado del proceso al confirmar"""
+    if raw:
+        return
+    kind = sender._meta.model_name
+    if kind == 'user' and not autocomplete.is_sales_rep(instance):
+        transaction.on_commit(lambda: autocomplete.index.delete(kind, instance.pk))
+        return
+    model, fields = autocomplete.KINDS[kind]
+    row = {field: getattr(instance, field) for field in fields}
+    transaction.on_commit(lambda: autocomplete.index.upsert(kind, row))
+
+
+def update_autocomplete_on_delete(sender, instance, **kwargs):
+    kind, object_id = sender._meta.model_name, instance.pk
+    transaction.on_commit(lambda: autocomplete.index.delete(kind, object_id))
+
+
+for _name, (_model, _fields) in autocomplete.KINDS.items():
+    post_save.connect(update_autocomplete_on_save, sender=_model, dispatch_uid=f'autocomplete_save_{_name}')
+    post_delete.connect(update_autocomplete_on_delete, sender=_model, dispatch_uid=f'autocomplete_delete_{_name}')
+
+
+@receiver(pre_delete, sender=User)
+def record_unassigned_customers(sender, instance, **kwargs):
+    """El SET_NULL de sales_rep se aplica con un UPDATE sin señales por cliente"""
+    customer_ids = instance.customers.values_list('pk', flat=True)
+    changes.record('customer', customer_ids, ChangeLogEntry.Action.UPDATE)
+
+
+@receiver(customers_reassigned)
+def record_reassigned_customers(sender, customer_ids, **kwargs):
+    """Una entrada por cliente reasignado, escrita en la misma transacción"""
+    changes.record('customer', customer_ids, ChangeLogEntry.Action.UPDATE)
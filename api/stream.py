@@ -0,0 +1,122 @@
+"""
+Stream de cambios de interacciones por Server-Sent Events.
+
+changes.record emite un NOTIFY al escribir en el registro de cambios. Cada
+conexión SSE escucha ese canal (LISTEN) y, al despertar o tras cada
+keepalive, lee el feed desde su último token con changes_since. El token
+viaja como id de cada evento: el navegador reconecta con Last-Event-ID y
+continúa sin perder cambios aunque se pierda alguna notificación.
+
+Cada conexión abierta ocupa una conexión de PostgreSQL para el LISTEN; la
+de Django se cierra después de cada lectura (fetch_page). Se
+sirve con uvicorn (testingpython.asgi, servicio stream de docker-compose);
+gunicorn (WSGI) responde 501 en esta ruta.
+"""
+import json
+from contextlib import aclosing
+
+import psycopg
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections
+
+from . import changes
+from .models import Customer
+
+KEEPALIVE_SECONDS = 15
+PAGE_SIZE = 500
+
+
+def listen_params(alias='default'):
+    """Parámetros de psycopg para una conexión dedicada al LISTEN"""
+    settings_dict = connections[alias].settings_dict
+    params = {
+        'dbname': settings_dict['NAME'],
+        'user': settings_dict['USER'],
+        'password': settings_dict['PASSWORD'],
+        'host': settings_dict['HOST'],
+        'port': settings_dict['PORT'],
+    }
+    return {key: value for key, value in params.items() if value}
+
+
+def read_page(token, customer_id=None, sales_rep_id=None):
+    """
+    Siguiente página de cambios de interacciones tras token, filtrada por
+    cliente o por el representante actual del cliente. Las bajas se filtran
+    por el cliente registrado con ellas; con filtro, los cambios cuyo cliente
+    no se conoce no se envían.
+    """
+    results, token, has_more = changes.changes_since(token, PAGE_SIZE, ['interaction'])
+
+    def owner(change):
+        # data es None si el objeto se borró después: su baja llega más adelante
+        data = change.get('data')
+        return data['customer_id'] if data else change.get('customer_id')
+
+    if customer_id:
+        results = [change for change in results if owner(change) == customer_id]
+    if sales_rep_id:
+        customer_ids = {owner(change) for change in results} - {None}
+        allowed = set(
+            Customer.objects.filter(pk__in=customer_ids, sales_rep_id=sales_rep_id)
+            .values_list('pk', flat=True)
+        )
+        results = [change for change in results if owner(change) in allowed]
+    return results, token, has_more
+
+
+def fetch_page(token, customer_id=None, sales_rep_id=None):
+    """
+    read_page cerrando después la conexión de Django: entre lecturas cada
+    cliente SSE solo ocupa la conexión del LISTEN.
+    """
+    try:
+        return read_page(token, customer_id, sales_rep_id)
+    finally:
+        connection.close()
+
+
+def format_event(results, token):
+    data = json.dumps(results, cls=DjangoJSONEncoder)
+    return f'id: {token}\nevent: interactions\ndata: {data}\n\n'
+
+
+async def wait_for_change(listener):
+    """True si llegó un NOTIFY de interacciones antes del keepalive"""
+    async with aclosing(listener.notifies(timeout=KEEPALIVE_SECONDS)) as notifies:
+        async for notify in notifies:
+            if notify.payload == 'interaction':
+                return True
+    return False
+
+
+async def interaction_events(token, customer_id=None, sales_rep_id=None):
+    """Genera los eventos SSE desde token hasta que el cliente se desconecta"""
+    async with await psycopg.AsyncConnection.connect(**listen_params(), autocommit=True) as listener:
+        # LISTEN antes de la primera lectura: lo confirmado entre medias despierta al bucle
+        await listener.execute(f'LISTEN {changes.NOTIFY_CHANNEL}')
+        yield 'retry: 3000\n\n'
+
+        while True:
+            has_more = True
+            while has_more:
+                try:
+                    results, new_token, has_more = await sync_to_async(fetch_page)(
+                        token, customer_id, sales_rep_id
+                    )
+                except changes.TokenExpired:
+                    # Solo si el cliente se quedó atrás más que la retención: que resincronice
+                    yield 'event: resync\ndata: {}\n\n'
+                    return
+                if results:
+                    yield format_event(results, new_token)
+                elif new_token != token:
+                    # Página filtrada por completo: avanzar el id sin enviar datos
+                    yield f'id: {new_token}\n\n'
+                token = new_token
+
+            # Sin NOTIFY también se relee: los cambios aún ocultos por una
+            # transacción más antigua en curso aparecen en la siguiente vuelta
+            if not await wait_for_change(listener):
+                yield ': keepalive\n\n'
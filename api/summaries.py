@@ -0,0 +1,202 @@
+"""
+Mantenimiento de la tabla CustomerInteractionSummary.
+
+Cada alta de Interaction suma sobre el resumen de su cliente sin leer la tabla
+cruda. Las bajas restan y solo consultan la tabla cruda (con el índice
+(customer, -interaction_date)) cuando la interacción borrada era la primera o
+la última de su tipo o del cliente; un borrado de varias interacciones
+reconstruye de una vez los resúmenes de sus clientes, y en la cascada del
+borrado de un cliente no hay nada que hacer. Como en los agregados diarios, las
+interacciones archivadas siguen contando y las cargas masivas requieren
+reconstruir con rebuild_interaction_summaries.
+"""
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from . import rollups
+from .models import ArchivedInteraction, CustomerInteractionSummary, Interaction
+
+ACTIVITY_DAYS = 30
+BATCH_SIZE = 2000
+
+
+def _parse(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def activity_start(today=None):
+    """Primer día de la ventana de actividad reciente que termina en today (hoy)"""
+    return (today or timezone.localdate()) - timedelta(days=ACTIVITY_DAYS - 1)
+
+
+def recent_activity(summary):
+    """Actividad diaria del resumen limitada a la ventana actual"""
+    start = activity_start().isoformat()
+    return {day: count for day, count in sorted(summary.recent_activity.items()) if day >= start}
+
+
+def _bump_activity(summary, interaction_date, delta):
+    day = rollups.rollup_day(interaction_date).isoformat()
+    activity = recent_activity(summary)
+    if day >= activity_start().isoformat():
+        activity[day] = activity.get(day, 0) + delta
+    summary.recent_activity = {day: count for day, count in activity.items() if count > 0}
+
+
+def _edge(customer_id, interaction_type=None, first=False):
+    """(fecha, tipo) de la última (o primera) interacción activa o archivada"""
+    candidates = []
+    for model in (Interaction, ArchivedInteraction):
+        queryset = model.objects.filter(customer_id=customer_id)
+        if interaction_type:
+            queryset = queryset.filter(interaction_type=interaction_type)
+        row = (
+            queryset.order_by('interaction_date' if first else '-interaction_date')
+            .values_list('interaction_date', 'interaction_type')
+            .first()
+        )
+        if row:
+            candidates.append(row)
+    if not candidates:
+        return None
+    return min(candidates) if first else max(candidates)
+
+
+def _merge(summary, interaction_type, count, first, last):
+    """Suma count interacciones de un tipo con fechas entre first y last"""
+    summary.total += count
+    summary.counts[interaction_type] = summary.counts.get(interaction_type, 0) + count
+
+    last_of_type = _parse(summary.last_by_type.get(interaction_type))
+    if last_of_type is None or last > last_of_type:
+        summary.last_by_type[interaction_type] = last.isoformat()
+    if summary.first_interaction_at is None or first < summary.first_interaction_at:
+        summary.first_interaction_at = first
+    if summary.last_interaction_at is None or last >= summary.last_interaction_at:
+        summary.last_interaction_at = last
+        summary.last_interaction_type = interaction_type
+
+
+def add(customer_id, interaction_date, interaction_type):
+    """Suma una interacción al resumen del cliente, creándolo si no existe"""
+    with transaction.atomic():
+        summary, _ = (
+            CustomerInteractionSummary.objects.select_for_update()
+            .get_or_create(customer_id=customer_id)
+        )
+        _merge(summary, interaction_type, 1, interaction_date, interaction_date)
+        _bump_activity(summary, interaction_date, 1)
+        summary.save()
+
+
+def remove(customer_id, interaction_date, interaction_type):
+    """Descuenta una interacción ya borrada (o modificada) del resumen del cliente"""
+    with transaction.atomic():
+        summary = (
+            CustomerInteractionSummary.objects.select_for_update()
+            .filter(customer_id=customer_id)
+            .first()
+        )
+        if summary is None:
+            # Cliente en proceso de borrado o resumen aún sin construir
+            return
+
+        summary.total = max(summary.total - 1, 0)
+        remaining = summary.counts.get(interaction_type, 0) - 1
+        last_of_type = _parse(summary.last_by_type.get(interaction_type))
+        summary.counts.pop(interaction_type, None)
+        summary.last_by_type.pop(interaction_type, None)
+        if remaining > 0:
+            summary.counts[interaction_type] = remaining
+            if last_of_type == interaction_date:
+                last_of_type = (_edge(customer_id, interaction_type) or (None,))[0]
+            if last_of_type:
+                summary.last_by_type[interaction_type] = last_of_type.isoformat()
+
+        first, last = summary.first_interaction_at, summary.last_interaction_at
+        if summary.total == 0 or first is None or last is None:
+            first = last = None
+        else:
+            if interaction_date <= first:
+                first = (_edge(customer_id, first=True) or (None,))[0]
+            if interaction_date >= last:
+                last, summary.last_interaction_type = _edge(customer_id) or (None, '')
+        summary.first_interaction_at, summary.last_interaction_at = first, last
+        if last is None:
+            summary.last_interaction_type = ''
+
+        _bump_activity(summary, interaction_date, -1)
+        summary.save()
+
+
+def build(customer_ids, today=None):
+    """
+    Resúmenes calculados desde las tablas crudas (solo clientes con
+    interacciones), con la actividad reciente hasta today (hoy por defecto).
+    """
+    summaries = {
+        customer_id: CustomerInteractionSummary(customer_id=customer_id)
+        for customer_id in customer_ids
+    }
+    end = today or timezone.localdate()
+    start = activity_start(end)
+
+    for model in (Interaction, ArchivedInteraction):
+        rows = (
+            model.objects.filter(customer_id__in=customer_ids)
+            .order_by()
+            .values('customer_id', 'interaction_type')
+            .annotate(count=Count('id'), first=Min('interaction_date'), last=Max('interaction_date'))
+        )
+        for row in rows:
+            _merge(
+                summaries[row['customer_id']], row['interaction_type'],
+                row['count'], row['first'], row['last']
+            )
+
+        activity = (
+            rollups._raw_by_day(model, start, end)
+            .filter(customer_id__in=customer_ids)
+            .values('customer_id', 'day')
+            .annotate(count=Count('id'))
+        )
+        for row in activity:
+            summary = summaries[row['customer_id']]
+            day = row['day'].isoformat()
+            summary.recent_activity[day] = summary.recent_activity.get(day, 0) + row['count']
+
+    return [summary for summary in summaries.values() if summary.total]
+
+
+def rebuild(customer_ids, today=None):
+    """
+    Reconstruye los resúmenes de los clientes dentro de la transacción actual,
+    por lotes de BATCH_SIZE. Retorna el número de resúmenes creados.
+    """
+    customer_ids = sorted(customer_ids)
+    created = 0
+    for offset in range(0, len(customer_ids), BATCH_SIZE):
+        batch = rollups.lock_customers(customer_ids[offset:offset + BATCH_SIZE])
+        CustomerInteractionSummary.objects.filter(customer_id__in=batch).delete()
+        created += len(CustomerInteractionSummary.objects.bulk_create(build(batch, today)))
+    return created
+
+
+def rebuild_all(progress=None, today=None):
+    """
+    Reconstruye la tabla completa por lotes de clientes, cada lote en su propia
+    transacción (ver rollups.rebuild_all). today fija el final de la ventana de
+    actividad (ver build). progress(hechos) se llama tras cada lote. Retorna el
+    número de resúmenes creados.
+    """
+    created = done = 0
+    for batch in rollups.customer_batches(BATCH_SIZE):
+        with transaction.atomic():
+            created += rebuild(batch, today)
+        done += len(batch)
+        if progress:
+            progress(done)
+    return created
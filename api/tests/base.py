@@ -0,0 +1,19 @@
+"""
+Clases base de los tests.
+"""
+from django.test import TestCase
+
+from api import datasets
+
+
+class DatasetTestCase(TestCase):
+    """
+    TestCase con el dataset del tier (semilla DEFAULT_SEED) cargado una vez
+    por clase desde su snapshot; la primera ejecución lo genera y lo guarda
+    en DATASET_SNAPSHOT_DIR.
+    """
+    tier = 'small'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manifest = datasets.load_dataset(cls.tier)
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from api import services
+from api.models import (
+    ArchivedInteraction, ChangeLogEntry, CustomerInteractionSummary, Interaction, InteractionDailyRollup
+)
+
+from .base import DatasetTestCase
+
+
+class ArchiveBatchTests(DatasetTestCase):
+    def setUp(self):
+        dates = Interaction.objects.order_by('interaction_date').values_list('interaction_date', flat=True)
+        # Las 100 más antiguas
+        self.cutoff = dates[99] + timedelta(microseconds=1)
+        self.oldest = list(Interaction.objects.filter(interaction_date__lt=self.cutoff).order_by('pk'))
+
+    def test_batch_moves_oldest_rows_with_their_data(self):
+        moved = services.archive_interactions_batch(self.cutoff, 1000)
+
+        self.assertEqual(moved, len(self.oldest))
+        self.assertFalse(Interaction.objects.filter(interaction_date__lt=self.cutoff).exists())
+        archived = {row.pk: row for row in ArchivedInteraction.objects.all()}
+        for interaction in self.oldest:
+            row = archived[interaction.pk]
+            self.assertEqual(
+                (row.customer_id, row.interaction_type, row.notes, row.interaction_date),
+                (
+                    interaction.customer_id, interaction.interaction_type,
+                    interaction.notes, interaction.interaction_date,
+                ),
+            )
+
+    def test_batch_size_and_resume(self):
+        total, batches = services.archive_interactions(self.cutoff, batch_size=30, sleep=0)
+
+        self.assertEqual(total, len(self.oldest))
+        # 4 lotes con filas y uno vacío que termina
+        self.assertEqual(batches, 5)
+        self.assertEqual(services.archive_interactions_batch(self.cutoff, 30), 0)
+
+    def test_batch_logs_deletes_with_their_customer(self):
+        services.archive_interactions_batch(self.cutoff, 1000)
+
+        logged = set(
+            ChangeLogEntry.objects.filter(model='interaction', action=ChangeLogEntry.Action.DELETE)
+            .values_list('object_id', 'customer_id')
+        )
+        self.assertEqual(logged, {(interaction.pk, interaction.customer_id) for interaction in self.oldest})
+
+    def test_ids_already_archived_are_skipped_not_lost(self):
+        conflict = self.oldest[0]
+        ArchivedInteraction.objects.create(
+            id=conflict.pk, customer_id=conflict.customer_id,
+            interaction_type=conflict.interaction_type, interaction_date=conflict.interaction_date,
+        )
+
+        moved = services.archive_interactions_batch(self.cutoff, 1000)
+
+        self.assertEqual(moved, len(self.oldest) - 1)
+        self.assertTrue(Interaction.objects.filter(pk=conflict.pk).exists())
+        self.assertEqual(list(services.archive_conflicts(self.cutoff)), [conflict])
+
+    def test_summaries_and_rollups_keep_counting_archived(self):
+        summaries = {
+            summary.pk: (summary.total, summary.first_interaction_at, summary.last_interaction_at)
+            for summary in CustomerInteractionSummary.objects.all()
+        }
+        rolled = list(InteractionDailyRollup.objects.order_by('pk').values_list('pk', 'count'))
+
+        services.archive_interactions_batch(self.cutoff, 1000)
+
+        self.assertEqual({
+            summary.pk: (summary.total, summary.first_interaction_at, summary.last_interaction_at)
+            for summary in CustomerInteractionSummary.objects.all()
+        }, summaries)
+        self.assertEqual(list(InteractionDailyRollup.objects.order_by('pk').values_list('pk', 'count')), rolled)
@@ -0,0 +1,128 @@
+import uuid
+
+from django.test import SimpleTestCase
+
+from api.autocomplete import PrefixIndex
+from api.models import Customer, User
+
+from .base import DatasetTestCase
+
+
+def customer(first_name, last_name, email):
+    return {'id': uuid.uuid4(), 'first_name': first_name, 'last_name': last_name, 'email': email}
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = PrefixIndex(max_entries=100, sync_seconds=60)
+        self.index.built = True
+
+    def add(self, row, kind='customer'):
+        ref = (kind, row['id'])
+        self.index._insert(ref, row)
+        return ref
+
+    def found(self, query):
+        return [(result['type'], result['id']) for result in self.index.search(query, limit=50)]
+
+    def assertConsistent(self):
+        """Términos ordenados, referencias paralelas y cada término de un documento indexado"""
+        self.assertEqual(self.index.keys, sorted(self.index.keys))
+        self.assertEqual(len(self.index.keys), len(self.index.refs))
+        expected = sorted(
+            (key, ref) for ref, (label, detail, keys) in self.index.documents.items() for key in keys
+        )
+        self.assertEqual(sorted(zip(self.index.keys, self.index.refs)), expected)
+
+    def test_insert_indexes_every_word_without_accents(self):
+        ref = self.add(customer('José María', 'López', 'jm@example.com'))
+
+        for query in ['jose', 'MARIA', 'lóp', 'jm@ex']:
+            self.assertEqual(self.found(query), [ref], query)
+        self.assertEqual(self.found('ana'), [])
+        self.assertConsistent()
+
+    def test_remove_only_the_given_document(self):
+        first = self.add(customer('Ana', 'Pérez', 'ana1@example.com'))
+        second = self.add(customer('Ana', 'Pérez', 'ana2@example.com'))
+        self.add(customer('Luis', 'Gómez', 'luis@example.com'))
+
+        self.index._remove(first)
+
+        self.assertEqual(self.found('ana perez'), [second])
+        self.assertNotIn(first, self.index.documents)
+        self.assertConsistent()
+
+    def test_remove_unknown_is_a_no_op(self):
+        self.add(customer('Ana', 'Pérez', 'ana@example.com'))
+        self.index._remove(('customer', uuid.uuid4()))
+        self.assertConsistent()
+
+    def test_upsert_replaces_old_terms(self):
+        row = customer('Ana', 'Pérez', 'ana@example.com')
+        ref = self.add(row)
+
+        self.index.upsert('customer', {**row, 'last_name': 'Ruiz'})
+
+        self.assertEqual(self.found('ruiz'), [ref])
+        self.assertEqual(self.found('perez'), [])
+        self.assertConsistent()
+
+    def test_insert_over_max_entries_marks_truncated(self):
+        self.index.max_entries = 5
+        self.add(customer('Ana', 'Pérez', 'ana@example.com'))
+        ref = self.add(customer('Luis', 'Gómez', 'luis@example.com'))
+
+        self.assertTrue(self.index.truncated)
+        self.assertNotIn(ref, self.index.documents)
+        self.assertConsistent()
+
+    def test_apply_batch_matches_one_by_one(self):
+        ana = self.add(customer('Ana', 'Pérez', 'ana@example.com'))
+        luis = self.add(customer('Luis', 'Gómez', 'luis@example.com'))
+        marta = customer('Marta', 'Sanz', 'marta@example.com')
+
+        with self.index.lock:
+            self.index._apply({
+                ana: None,
+                luis: {**customer('Luis', 'Ruiz', 'luis@example.com'), 'id': luis[1]},
+                ('customer', marta['id']): marta,
+            })
+
+        self.assertEqual(self.found('ana'), [])
+        self.assertEqual(self.found('luis ruiz'), [luis])
+        self.assertEqual(self.found('gomez'), [])
+        self.assertEqual(self.found('marta'), [('customer', marta['id'])])
+        self.assertConsistent()
+
+    def test_apply_respects_max_entries(self):
+        self.index.max_entries = 5
+        first, second = customer('Ana', 'Pérez', 'ana@example.com'), customer('Luis', 'Gómez', 'luis@example.com')
+
+        with self.index.lock:
+            self.index._apply({('customer', first['id']): first, ('customer', second['id']): second})
+
+        self.assertTrue(self.index.truncated)
+        self.assertEqual(len(self.index.documents), 1)
+        self.assertConsistent()
+
+
+class PrefixIndexBuildTests(DatasetTestCase):
+    def test_build_finds_dataset_customers(self):
+        index = PrefixIndex(max_entries=100_000, sync_seconds=60)
+        index.build()
+
+        target = Customer.objects.order_by('pk').first()
+        results = index.search(target.email, limit=50)
+        self.assertIn(('customer', target.pk), [(result['type'], result['id']) for result in results])
+        self.assertFalse(index.truncated)
+
+    def test_superusers_without_customers_are_not_reps(self):
+        admin = User.objects.create_superuser('root', 'root@example.com', 'password')
+        index = PrefixIndex(max_entries=100_000, sync_seconds=60)
+        index.build()
+        self.assertNotIn(('user', admin.pk), index.documents)
+
+        Customer.objects.filter(pk=Customer.objects.order_by('pk').values('pk')[:1]).update(sales_rep=admin)
+        index.build()
+        self.assertIn(('user', admin.pk), index.documents)
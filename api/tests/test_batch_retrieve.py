@@ -0,0 +1,50 @@
+import uuid
+
+from api.models import Company, Customer, Interaction
+from api.views import BatchRetrieveMixin
+
+from .base import DatasetTestCase
+
+
+class BatchRetrieveTests(DatasetTestCase):
+    def get_ids(self, url, ids, **params):
+        return self.client.get(url, {'ids': ','.join(map(str, ids)), **params})
+
+    def test_results_follow_requested_order(self):
+        customers = list(Customer.objects.order_by('pk').values_list('pk', flat=True)[:5])
+        requested = [customers[3], customers[0], customers[4], customers[1]]
+
+        response = self.get_ids('/api/customers/', requested)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()['results']], list(map(str, requested)))
+        self.assertEqual(response.json()['missing'], [])
+
+    def test_missing_and_repeated_ids(self):
+        first, second = Company.objects.order_by('-name').values_list('pk', flat=True)[:2]
+        unknown = uuid.uuid4()
+
+        response = self.get_ids('/api/companies/', [second, unknown, first, second])
+
+        self.assertEqual([row['id'] for row in response.json()['results']], [str(second), str(first)])
+        self.assertEqual(response.json()['missing'], [str(unknown)])
+
+    def test_repeated_ids_parameter_and_sparse_fields(self):
+        first, second = Interaction.objects.order_by('pk').values_list('pk', flat=True)[:2]
+
+        response = self.client.get(
+            f'/api/interactions/?ids={second}&ids={first}&fields=id,interaction_type'
+        )
+
+        results = response.json()['results']
+        self.assertEqual([row['id'] for row in results], [str(second), str(first)])
+        self.assertEqual(set(results[0]), {'id', 'interaction_type'})
+
+    def test_invalid_id(self):
+        response = self.get_ids('/api/customers/', ['no-es-un-uuid'])
+        self.assertEqual(response.status_code, 400)
+
+    def test_too_many_ids(self):
+        ids = [uuid.uuid4() for _ in range(BatchRetrieveMixin.max_batch_size + 1)]
+        response = self.get_ids('/api/users/', ids)
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+import psycopg
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from api import changes, stream
+from api.models import ChangeLogEntry, Company
+
+
+class ChangeFeedTests(TransactionTestCase):
+    """
+    Sin TestCase: el feed solo entrega las entradas de transacciones ya
+    terminadas y la de un TestCase sigue abierta durante todo el test.
+    """
+
+    def read_all(self, token, limit):
+        pages = []
+        has_more = True
+        while has_more:
+            results, token, has_more = changes.changes_since(token, limit)
+            pages.append(results)
+        return pages, token
+
+    def test_pages_follow_the_token_without_gaps_or_repeats(self):
+        start = changes.head_token()
+        created = [Company.objects.create(name=f'Compañía {i}').pk for i in range(7)]
+
+        pages, token = self.read_all(start, limit=3)
+
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([change['id'] for page in pages for change in page], created)
+        self.assertEqual(changes.changes_since(token, 3), ([], token, False))
+
+    def test_page_keeps_only_the_latest_action_per_object(self):
+        start = changes.head_token()
+        kept = Company.objects.create(name='Primera')
+        kept.name = 'Renombrada'
+        kept.save()
+        deleted = Company.objects.create(name='Efímera')
+        deleted_id = deleted.pk
+        deleted.delete()
+
+        results, token, has_more = changes.changes_since(start)
+
+        self.assertFalse(has_more)
+        by_id = {change['id']: change for change in results}
+        self.assertEqual(len(results), 2)
+        self.assertEqual(by_id[kept.pk]['action'], ChangeLogEntry.Action.UPDATE)
+        self.assertEqual(by_id[kept.pk]['data']['name'], 'Renombrada')
+        self.assertEqual(by_id[deleted_id]['action'], ChangeLogEntry.Action.DELETE)
+        self.assertNotIn('data', by_id[deleted_id])
+
+    def test_open_transaction_holds_back_later_entries(self):
+        start = changes.head_token()
+        with psycopg.connect(**stream.listen_params()) as other:
+            other.execute(
+                "INSERT INTO api_company (id, name, created_at, updated_at) "
+                "VALUES (gen_random_uuid(), 'Abierta', now(), now())"
+            )
+            later = Company.objects.create(name='Posterior')
+
+            self.assertEqual(changes.changes_since(start), ([], start, False))
+            status = changes.status()
+            self.assertEqual(status['pending_entries'], 1)
+            self.assertEqual(status['oldest_transaction']['state'], 'idle in transaction')
+            other.rollback()
+
+        results, token, has_more = changes.changes_since(start)
+        self.assertEqual([change['id'] for change in results], [later.pk])
+
+    def test_invalid_token(self):
+        with self.assertRaises(changes.InvalidToken):
+            changes.changes_since('no-es-un-token')
+
+    def test_pruned_token_expires(self):
+        Company.objects.create(name='Antigua')
+        token = changes.head_token()
+        Company.objects.create(name='Reciente')
+        ChangeLogEntry.objects.filter(model='company').update(changed_at=timezone.now() - timedelta(days=60))
+        Company.objects.create(name='Nueva')
+
+        self.assertEqual(changes.prune(retention_days=30), 2)
+
+        with self.assertRaises(changes.TokenExpired):
+            changes.changes_since(token)
+        results, next_token, has_more = changes.changes_since(changes.head_token())
+        self.assertEqual(results, [])
@@ -0,0 +1,64 @@
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import Group
+
+from api import changes, datasets
+from api.models import ChangeLogEntry, Customer, CustomerInteractionSummary, Interaction, User
+
+from .base import DatasetTestCase
+
+
+def snapshot_files(path):
+    return {file.name: file.read_bytes() for file in sorted(Path(path).glob('*.copy.gz'))}
+
+
+class DatasetTests(DatasetTestCase):
+    def test_small_tier_counts(self):
+        tier = datasets.TIERS['small']
+        self.assertEqual(User.objects.filter(is_superuser=False).count(), tier['users'])
+        self.assertEqual(Customer.objects.count(), tier['customers'])
+        self.assertEqual(
+            Interaction.objects.count(), tier['customers'] * tier['interactions_per_customer']
+        )
+        self.assertEqual(CustomerInteractionSummary.objects.count(), tier['customers'])
+
+    def test_reload_keeps_superusers_and_their_permissions(self):
+        group = Group.objects.create(name='soporte')
+        admin = User.objects.create_superuser('root', 'root@example.com', 'password')
+        admin.groups.add(group)
+
+        datasets.load_dataset('small')
+
+        admin = User.objects.get(username='root')
+        self.assertTrue(admin.is_superuser)
+        self.assertEqual(list(admin.groups.all()), [group])
+        self.assertEqual(Customer.objects.count(), datasets.TIERS['small']['customers'])
+
+    def test_restore_refuses_non_empty_tables(self):
+        with self.assertRaises(datasets.SnapshotError):
+            datasets.restore_snapshot(datasets.snapshot_path('small'))
+
+    def test_restore_ignores_superusers_when_checking_emptiness(self):
+        User.objects.create_superuser('root', 'root@example.com', 'password')
+        datasets.clear()
+        datasets.restore_snapshot(datasets.snapshot_path('small'))
+        self.assertEqual(User.objects.filter(is_superuser=False).count(), datasets.TIERS['small']['users'])
+
+    def test_reload_expires_change_feed_tokens(self):
+        Customer.objects.first().save()
+        token = changes.encode_token(*ChangeLogEntry.objects.values_list('txid', 'id').get())
+
+        datasets.load_dataset('small')
+
+        self.assertFalse(ChangeLogEntry.objects.exists())
+        with self.assertRaises(changes.TokenExpired):
+            changes.check_token(token)
+
+    def test_seeded_generation_is_byte_identical(self):
+        with tempfile.TemporaryDirectory() as directory:
+            datasets.generate(seed=datasets.DEFAULT_SEED, **datasets.TIERS['small'])
+            datasets.save_snapshot(directory)
+            self.assertEqual(
+                snapshot_files(directory), snapshot_files(datasets.snapshot_path('small'))
+            )
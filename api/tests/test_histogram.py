@@ -0,0 +1,83 @@
+from collections import Counter
+
+from rest_framework.test import APIClient
+
+from api import rollups
+from api.models import Interaction, InteractionDailyRollup
+
+from .base import DatasetTestCase
+
+URL = '/api/interactions/histogram/'
+
+
+class HistogramTests(DatasetTestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def histogram(self, **params):
+        response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()['results']
+
+    def counts(self, results):
+        return {(row['bucket'], row.get('group')): row['count'] for row in results}
+
+    def test_raw_buckets_count_every_interaction(self):
+        results = self.histogram(interval='month')
+
+        expected = Counter(
+            date.strftime('%Y-%m') for date in Interaction.objects.values_list('interaction_date', flat=True)
+        )
+        self.assertEqual({row['bucket'][:7]: row['count'] for row in results}, expected)
+
+    def test_rollup_matches_raw_by_interval_and_group(self):
+        for interval in ['day', 'week', 'month']:
+            for group_by in [None, 'interaction_type']:
+                params = {'interval': interval}
+                if group_by:
+                    params['group_by'] = group_by
+                raw = self.histogram(**params)
+                rolled = self.histogram(source='rollup', **params)
+                self.assertEqual(self.counts(rolled), self.counts(raw), (interval, group_by))
+
+    def test_rollup_applies_type_filter(self):
+        params = {'interval': 'month', 'interaction_type': Interaction.InteractionType.CALL}
+        self.assertEqual(
+            self.counts(self.histogram(source='rollup', **params)), self.counts(self.histogram(**params))
+        )
+
+    def test_rollup_reflects_single_writes(self):
+        interaction = Interaction.objects.order_by('pk').first()
+        interaction.interaction_type = Interaction.InteractionType.MEETING
+        interaction.save()
+        Interaction.objects.order_by('pk').last().delete()
+
+        self.assertEqual(
+            self.counts(self.histogram(source='rollup', interval='day', group_by='interaction_type')),
+            self.counts(self.histogram(interval='day', group_by='interaction_type')),
+        )
+
+    def test_rollup_rejects_hour_and_search(self):
+        for params in [{'interval': 'hour'}, {'interval': 'day', 'search': 'llamada'}]:
+            response = self.client.get(URL, {'source': 'rollup', **params})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('source', response.json())
+
+    def test_invalid_parameters(self):
+        for params in [{'interval': 'year'}, {'group_by': 'notes'}, {'source': 'cache'}]:
+            self.assertEqual(self.client.get(URL, params).status_code, 400, params)
+
+
+class StaleRollupTests(DatasetTestCase):
+    def test_offsetting_errors_are_stale(self):
+        day = rollups.rollup_day(Interaction.objects.order_by('pk').first().interaction_date)
+        first, second = InteractionDailyRollup.objects.filter(day=day, count__gt=0)[:2]
+        # Mismo total diario, contadores de cliente y tipo equivocados
+        first.count += 1
+        second.count -= 1
+        first.save()
+        second.save()
+
+        self.assertEqual(list(rollups.stale_days(day, day)), [day])
+        self.assertEqual(rollups.refresh_stale_days(day, day), [day])
+        self.assertEqual(rollups.stale_days(day, day), {})
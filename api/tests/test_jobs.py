@@ -0,0 +1,101 @@
+from datetime import timedelta
+from unittest import mock
+
+import psycopg
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import jobs, stream
+from api.models import Job
+
+
+def heartbeat_twice(current):
+    current.report_progress(1, 2)
+    current.report_progress(2, 2)
+    return {'ok': True}
+
+
+class JobLeaseTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(jobs.registry, {'heartbeat': heartbeat_twice})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def expire(self, job):
+        Job.objects.filter(pk=job.pk).update(updated_at=timezone.now() - jobs.STALE_AFTER - timedelta(seconds=1))
+
+    def test_running_job_is_not_claimed_while_alive(self):
+        jobs.enqueue('heartbeat')
+        self.assertIsNotNone(jobs.claim('w1'))
+
+        self.assertIsNone(jobs.claim('w2'))
+
+    def test_lost_lease_stops_the_old_worker_without_overwriting(self):
+        queued = jobs.enqueue('heartbeat')
+        first = jobs.claim('w1')
+        self.expire(queued)
+        second = jobs.claim('w2')
+        self.assertEqual((second.pk, second.attempts), (queued.pk, 2))
+
+        with self.assertRaises(Job.Lost):
+            first.report_progress(1, 2)
+        with self.assertLogs('api.jobs', 'WARNING'):
+            jobs.run(first)
+
+        job = Job.objects.get(pk=queued.pk)
+        self.assertEqual((job.status, job.locked_by), (Job.Status.RUNNING, 'w2'))
+
+        jobs.run(second)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.locked_by), (Job.Status.SUCCEEDED, {'ok': True}, ''))
+
+    def test_claim_respects_run_after_and_kinds(self):
+        later = jobs.enqueue('heartbeat', run_after=timezone.now() + timedelta(hours=1))
+        self.assertIsNone(jobs.claim('w1'))
+        Job.objects.filter(pk=later.pk).update(run_after=timezone.now())
+
+        self.assertIsNone(jobs.claim('w1', kinds=['prune_changes']))
+        self.assertEqual(jobs.claim('w1', kinds=['heartbeat']).pk, later.pk)
+
+
+class JobPayloadTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def create(self, kind, payload, expected_status):
+        response = self.client.post('/api/jobs/', {'kind': kind, 'payload': payload}, format='json')
+        self.assertEqual(response.status_code, expected_status, response.content)
+        return response.json()
+
+    def test_archive_rejects_recent_cutoffs(self):
+        errors = self.create('archive_interactions', {'older_than_days': 0}, 400)
+
+        self.assertIn('older_than_days', str(errors))
+        self.assertFalse(Job.objects.exists())
+
+    def test_defaults_are_filled_in(self):
+        job = self.create('archive_interactions', {}, 201)
+
+        self.assertEqual(job['payload'], {'older_than_days': 365, 'batch_size': 1000, 'sleep': 0.1})
+
+    def test_unknown_payload_fields_are_dropped(self):
+        job = self.create('rebuild_summaries', {'full': True}, 201)
+
+        self.assertEqual(job['payload'], {})
+
+
+class JobSkipLockedTests(TransactionTestCase):
+    """Sin TestCase: la otra conexión solo ve los trabajos ya confirmados"""
+
+    def test_claim_skips_rows_locked_by_another_worker(self):
+        first = jobs.enqueue('prune_changes', run_after=timezone.now() - timedelta(minutes=2))
+        second = jobs.enqueue('prune_changes', run_after=timezone.now() - timedelta(minutes=1))
+
+        with psycopg.connect(**stream.listen_params()) as other:
+            other.execute(f'SELECT id FROM {Job._meta.db_table} WHERE id = %s FOR UPDATE', [first.pk])
+
+            claimed = jobs.claim('w1')
+
+        self.assertEqual(claimed.pk, second.pk)
+        self.assertEqual(Job.objects.get(pk=first.pk).status, Job.Status.QUEUED)
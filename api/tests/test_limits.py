@@ -0,0 +1,89 @@
+import zlib
+from unittest import mock
+
+import psycopg
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from api import limits, stream
+from api.views import CustomerViewSet
+
+
+def slow_stats(queryset):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_sleep(0.5)')
+    return {}
+
+
+class StatementTimeoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def current_timeout(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            return cursor.fetchone()[0]
+
+    def test_cancelled_query_answers_503_with_retry_after(self):
+        before = self.current_timeout()
+
+        with mock.patch.object(CustomerViewSet, 'statement_timeouts', {'stats': 50}), \
+                mock.patch('api.views.customer_stats', slow_stats):
+            response = self.client.get('/api/customers/stats/')
+
+        self.assertEqual(response.status_code, 503, response.content)
+        self.assertEqual(response.json()['detail'], limits.QueryTimeout.default_detail)
+        self.assertEqual(response['Retry-After'], str(limits.RETRY_AFTER_SECONDS))
+        self.assertEqual(limits.counters(['customer.stats'])['customer.stats'], {'timeouts': 1, 'shed': 0})
+        # El SET LOCAL no sobrevive a la transacción de la petición
+        self.assertEqual(self.current_timeout(), before)
+
+    def test_fast_queries_are_not_affected(self):
+        response = self.client.get('/api/customers/stats/')
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(limits.counters(['customer.stats'])['customer.stats'], {'timeouts': 0, 'shed': 0})
+
+
+class ConcurrencyLimitTests(TransactionTestCase):
+    """Sin TestCase: las plazas las ocupa otra conexión, como otro worker"""
+    scope = 'customer.needs_attention'
+    url = '/api/customers/needs-attention/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def hold_slots(self, other, slots):
+        key = zlib.crc32(self.scope.encode()) & 0x7fffffff
+        other.execute('BEGIN')
+        for slot in range(slots):
+            other.execute('SELECT pg_advisory_xact_lock(%s, %s)', [key, slot])
+
+    def test_sheds_when_every_slot_is_taken(self):
+        slots = CustomerViewSet.concurrency_limits['needs_attention']
+        with psycopg.connect(**stream.listen_params(), autocommit=True) as other:
+            self.hold_slots(other, slots)
+
+            response = self.client.get(self.url)
+
+            self.assertEqual(response.status_code, 503, response.content)
+            self.assertEqual(response.json()['detail'], limits.Overloaded.default_detail)
+            self.assertEqual(response['Retry-After'], str(limits.RETRY_AFTER_SECONDS))
+            self.assertEqual(limits.counters([self.scope])[self.scope], {'timeouts': 0, 'shed': 1})
+
+            other.execute('ROLLBACK')
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_free_slot_is_used_and_released(self):
+        slots = CustomerViewSet.concurrency_limits['needs_attention']
+        with psycopg.connect(**stream.listen_params(), autocommit=True) as other:
+            self.hold_slots(other, slots - 1)
+
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.assertEqual(limits.counters([self.scope])[self.scope], {'timeouts': 0, 'shed': 0})
@@ -0,0 +1,55 @@
+from unittest import mock
+
+from api.models import ArchivedInteraction, Interaction
+from api.pagination import EstimatedCountPaginator, estimated_count
+
+from .base import DatasetTestCase
+
+
+class EstimatedCountPaginatorTests(DatasetTestCase):
+    def paginator(self, queryset, threshold):
+        return EstimatedCountPaginator(queryset.order_by('pk'), 20, exact_count_threshold=threshold)
+
+    def test_exact_count_below_threshold(self):
+        queryset = Interaction.objects.all()
+        paginator = self.paginator(queryset, threshold=1_000_000)
+
+        self.assertEqual(paginator.count, queryset.count())
+        self.assertFalse(paginator.count_is_estimate)
+
+    def test_unfiltered_count_above_threshold_uses_table_statistics(self):
+        paginator = self.paginator(Interaction.objects.all(), threshold=100)
+
+        # restore_snapshot analiza las tablas: reltuples es exacto en una tabla pequeña
+        self.assertEqual(paginator.count, Interaction.objects.count())
+        self.assertTrue(paginator.count_is_estimate)
+
+    def test_filtered_count_above_threshold_uses_plan_estimate(self):
+        queryset = Interaction.objects.filter(interaction_type=Interaction.InteractionType.CALL)
+        paginator = self.paginator(queryset, threshold=100)
+
+        self.assertEqual(paginator.count, max(estimated_count(queryset.order_by('pk')), 100))
+        self.assertTrue(paginator.count_is_estimate)
+        self.assertAlmostEqual(paginator.count, queryset.count(), delta=queryset.count() * 0.2)
+
+    def test_selective_filter_is_counted_exactly(self):
+        # El planificador estima un ILIKE sin coincidencias por encima de cero
+        queryset = Interaction.objects.filter(notes__icontains='no aparece en ninguna nota')
+        paginator = self.paginator(queryset, threshold=1)
+
+        self.assertEqual(paginator.count, 0)
+        self.assertFalse(paginator.count_is_estimate)
+
+    def test_empty_table_is_counted_exactly(self):
+        paginator = self.paginator(ArchivedInteraction.objects.all(), threshold=1)
+
+        self.assertEqual(paginator.count, 0)
+        self.assertFalse(paginator.count_is_estimate)
+
+    def test_api_listing_reports_estimate(self):
+        with mock.patch.object(EstimatedCountPaginator, 'exact_count_threshold', 100):
+            response = self.client.get('/api/interactions/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['count_is_estimate'])
+        self.assertEqual(response.json()['count'], Interaction.objects.count())
@@ -0,0 +1,75 @@
+from collections import Counter
+
+from rest_framework.test import APIClient
+
+from api.models import ChangeLogEntry, Customer, User
+
+from .base import DatasetTestCase
+
+URL = '/api/customers/bulk-reassign/'
+
+
+class BulkReassignTests(DatasetTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.rep = User.objects.order_by('username')[0]
+
+    def reassign(self, expected_status=200, **data):
+        response = self.client.post(URL, {'sales_rep': str(self.rep.pk), **data}, format='json')
+        self.assertEqual(response.status_code, expected_status, response.content)
+        return response.json()
+
+    def logged_updates(self):
+        return set(
+            ChangeLogEntry.objects.filter(model='customer', action=ChangeLogEntry.Action.UPDATE)
+            .values_list('object_id', flat=True)
+        )
+
+    def test_requires_ids_or_filters(self):
+        self.reassign(400)
+        self.reassign(400, ids=[])
+        self.reassign(400, filters={})
+
+    def test_rejects_unknown_or_invalid_filters(self):
+        errors = self.reassign(400, filters={'region': 'norte'})
+        self.assertIn('region', str(errors['filters']))
+
+        errors = self.reassign(400, filters={'sales_rep_id': 'no-es-un-uuid'})
+        self.assertIn('sales_rep_id', errors['filters'])
+
+        self.assertFalse(self.logged_updates())
+
+    def test_by_ids_updates_only_customers_that_change(self):
+        customers = list(Customer.objects.order_by('pk')[:20])
+        changed = [customer for customer in customers if customer.sales_rep_id != self.rep.pk]
+
+        result = self.reassign(ids=[str(customer.pk) for customer in customers])
+
+        self.assertEqual(result['updated'], len(changed))
+        self.assertEqual(result['sales_rep'], str(self.rep.pk))
+        previous = Counter(str(customer.sales_rep_id) if customer.sales_rep_id else None for customer in changed)
+        self.assertEqual({row['sales_rep']: row['count'] for row in result['previous_sales_reps']}, previous)
+        self.assertFalse(Customer.objects.filter(pk__in=[c.pk for c in customers]).exclude(sales_rep=self.rep).exists())
+        self.assertEqual(self.logged_updates(), {customer.pk for customer in changed})
+
+    def test_by_filters_combines_with_ids(self):
+        other = User.objects.exclude(pk=self.rep.pk).order_by('username')[0]
+        owned = set(Customer.objects.filter(sales_rep=other).values_list('pk', flat=True))
+        ids = [str(pk) for pk in Customer.objects.order_by('pk').values_list('pk', flat=True)[:50]]
+
+        result = self.reassign(ids=ids, filters={'sales_rep_id': str(other.pk)})
+
+        expected = owned & set(Customer.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        self.assertEqual(result['updated'], len(expected))
+        self.assertEqual(self.logged_updates(), expected)
+
+    def test_repeating_the_request_changes_nothing(self):
+        ids = [str(pk) for pk in Customer.objects.order_by('pk').values_list('pk', flat=True)[:10]]
+        self.reassign(ids=ids)
+        logged = ChangeLogEntry.objects.count()
+
+        result = self.reassign(ids=ids)
+
+        self.assertEqual(result['updated'], 0)
+        self.assertEqual(result['previous_sales_reps'], [])
+        self.assertEqual(ChangeLogEntry.objects.count(), logged)
@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import services, summaries
+from api.models import Customer, CustomerInteractionSummary, Interaction
+
+from .base import DatasetTestCase
+
+# Campos que no dependen de la fecha del día (recent_activity sí)
+FIELDS = [
+    'total', 'counts', 'last_by_type', 'first_interaction_at',
+    'last_interaction_at', 'last_interaction_type',
+]
+
+
+class SummaryRemoveTests(DatasetTestCase):
+    def setUp(self):
+        self.customer = Customer.objects.order_by('pk').first()
+        self.interactions = self.customer.interactions.order_by('interaction_date')
+
+    def assertMatchesRebuild(self):
+        """El resumen mantenido incrementalmente es igual al reconstruido desde cero"""
+        maintained = CustomerInteractionSummary.objects.get(customer=self.customer)
+        [rebuilt] = summaries.build([self.customer.pk])
+        for field in FIELDS:
+            self.assertEqual(getattr(maintained, field), getattr(rebuilt, field), field)
+
+    def test_delete_latest_recomputes_last_interaction(self):
+        latest = self.interactions.last()
+        latest.delete()
+
+        summary = CustomerInteractionSummary.objects.get(customer=self.customer)
+        self.assertEqual(summary.last_interaction_at, self.interactions.last().interaction_date)
+        self.assertMatchesRebuild()
+
+    def test_delete_earliest_recomputes_first_interaction(self):
+        self.interactions.first().delete()
+
+        summary = CustomerInteractionSummary.objects.get(customer=self.customer)
+        self.assertEqual(summary.first_interaction_at, self.interactions.first().interaction_date)
+        self.assertMatchesRebuild()
+
+    def test_delete_latest_of_type_recomputes_last_by_type(self):
+        interaction_type = self.interactions.last().interaction_type
+        of_type = self.interactions.filter(interaction_type=interaction_type)
+        of_type.last().delete()
+
+        summary = CustomerInteractionSummary.objects.get(customer=self.customer)
+        if of_type.exists():
+            self.assertEqual(
+                summary.last_by_type[interaction_type], of_type.last().interaction_date.isoformat()
+            )
+        self.assertMatchesRebuild()
+
+    def test_delete_every_interaction_of_type_drops_it(self):
+        interaction_type = self.interactions.first().interaction_type
+        for interaction in self.interactions.filter(interaction_type=interaction_type):
+            interaction.delete()
+
+        summary = CustomerInteractionSummary.objects.get(customer=self.customer)
+        self.assertNotIn(interaction_type, summary.counts)
+        self.assertNotIn(interaction_type, summary.last_by_type)
+        self.assertMatchesRebuild()
+
+    def test_delete_all_clears_edges(self):
+        for interaction in self.interactions:
+            interaction.delete()
+
+        summary = CustomerInteractionSummary.objects.get(customer=self.customer)
+        self.assertEqual(summary.total, 0)
+        self.assertIsNone(summary.first_interaction_at)
+        self.assertIsNone(summary.last_interaction_at)
+        self.assertEqual(summary.last_interaction_type, '')
+
+    def test_edges_include_archived_interactions(self):
+        dates = list(self.interactions.values_list('interaction_date', flat=True))
+        # Archivar las más antiguas del cliente: siguen contando para el primer contacto
+        services.archive_interactions_batch(dates[3] + timedelta(microseconds=1), 10_000)
+        self.interactions.first().delete()
+
+        summary = CustomerInteractionSummary.objects.get(customer=self.customer)
+        self.assertEqual(summary.first_interaction_at, dates[0])
+        self.assertMatchesRebuild()
+
+    def test_moving_latest_back_in_time(self):
+        latest = self.interactions.last()
+        latest.interaction_date = self.interactions.first().interaction_date - timedelta(days=1)
+        latest.save()
+
+        summary = CustomerInteractionSummary.objects.get(customer=self.customer)
+        self.assertEqual(summary.first_interaction_at, latest.interaction_date)
+        self.assertMatchesRebuild()
+
+    def test_queryset_delete_rebuilds_each_customer_once(self):
+        other = Customer.objects.order_by('pk')[1]
+        selected = Interaction.objects.filter(customer__in=[self.customer, other]).order_by('pk')[::3]
+
+        with self.assertNumQueries(12):
+            Interaction.objects.filter(pk__in=[interaction.pk for interaction in selected]).delete()
+
+        self.assertMatchesRebuild()
+        [rebuilt] = summaries.build([other.pk])
+        self.assertEqual(CustomerInteractionSummary.objects.get(customer=other).total, rebuilt.total)
+
+    def test_customer_cascade_skips_summary_upkeep(self):
+        customer_id = self.customer.pk
+        interactions = self.interactions.count()
+
+        with CaptureQueriesContext(connection) as captured:
+            self.customer.delete()
+
+        self.assertFalse(CustomerInteractionSummary.objects.filter(customer_id=customer_id).exists())
+        self.assertLess(len(captured), interactions)
@@ -8,8 +8,16 @@ router.register(r'customers', views.CustomerViewSet)
 router.register(r'companies', views.CompanyViewSet)
 router.register(r'users', views.UserViewSet)
 router.register(r'interactions', views.InteractionViewSet)
+router.register(r'archived-interactions', views.ArchivedInteractionViewSet)
+router.register(r'changes', views.ChangeFeedViewSet, basename='changes')
+router.register(r'jobs', views.JobViewSet)
+router.register(r'dashboard', views.DashboardViewSet, basename='dashboard')
+router.register(r'autocomplete', views.AutocompleteViewSet, basename='autocomplete')
+router.register(r'limits', views.LimitsViewSet, basename='limits')
 
 urlpatterns = [
+    # Antes del router: /interactions/<pk>/ también coincidiría con "stream"
+    path('interactions/stream/', views.interaction_stream, name='interaction-stream'),
     path('', include(router.urls)),
     path('auth/', include('rest_framework.urls')),  # Para autenticación en browsable API
 ]
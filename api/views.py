@@ -1,19 +1,37 @@
-from django.shortcuts import render
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, filters, status, mixins
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Prefetch
+from django.db.models import Q, Count, F, Sum, DateTimeField, Exists, OuterRef, Subquery
+from django.db.models.functions import Trunc, Cast, Coalesce
 from django.utils import timezone
-from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.utils import OperationalError
+from psycopg.errors import QueryCanceled
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+from datetime import timedelta
 import django_filters
+import hashlib
+import uuid
+from urllib.parse import urlencode
 
-from .models import User, Company, Customer, Interaction
+from .models import User, Company, Customer, Interaction, InteractionDailyRollup, ArchivedInteraction, Job
 from .serializers import (
     UserSerializer, CompanySerializer, CustomerListSerializer,
     CustomerDetailSerializer, CustomerCreateUpdateSerializer,
-    InteractionSerializer, InteractionCreateSerializer
+    InteractionSerializer, InteractionCreateSerializer, ArchivedInteractionSerializer, JobSerializer,
+    CustomerBulkReassignSerializer, CustomerAttentionSerializer,
+    SparseFieldsetsMixin, requested_fields
 )
+from .pagination import EstimatedCountPagination
+from .services import reassign_customers
+from . import autocomplete, changes, jobs, limits, stream
 
 
 class CustomerFilter(django_filters.FilterSet):
@@ -23,6 +41,8 @@ class CustomerFilter(django_filters.FilterSet):
     birthday_this_month = django_filters.BooleanFilter(method='filter_birthday_this_month')
     company = django_filters.CharFilter(field_name='company__name', lookup_expr='icontains')
     sales_rep = django_filters.CharFilter(method='filter_by_sales_rep')
+    sales_rep_id = django_filters.UUIDFilter(field_name='sales_rep')
+    inactive_days = django_filters.NumberFilter(method='filter_inactive_days', min_value=0)
 
     class Meta:
         model = Customer
@@ -34,27 +54,46 @@ class CustomerFilter(django_filters.FilterSet):
             Q(first_name__icontains=value) | Q(last_name__icontains=value)
         )
 
-    def filter_birthday_this_week(self, queryset, name, value):
-        """Filtrar clientes con cumpleaños esta semana"""
-        if not value:
-            return queryset
-
+    @staticmethod
+    def birthday_this_week_q():
+        """Condición de cumpleaños esta semana, reutilizable en filtros y conteos"""
         today = timezone.now().date()
         start_of_week = today - timedelta(days=today.weekday())
         end_of_week = start_of_week + timedelta(days=6)
 
-        return queryset.filter(
+        return Q(
             date_of_birth__month__in=[start_of_week.month, end_of_week.month],
             date_of_birth__day__range=[start_of_week.day, end_of_week.day]
         )
 
+    @staticmethod
+    def birthday_this_month_q():
+        """Condición de cumpleaños este mes, reutilizable en filtros y conteos"""
+        return Q(date_of_birth__month=timezone.now().month)
+
+    def filter_birthday_this_week(self, queryset, name, value):
+        """Filtrar clientes con cumpleaños esta semana"""
+        if not value:
+            return queryset
+        return queryset.filter(self.birthday_this_week_q())
+
     def filter_birthday_this_month(self, queryset, name, value):
         """Filtrar clientes con cumpleaños este mes"""
         if not value:
             return queryset
+        return queryset.filter(self.birthday_this_month_q())
+
+    def filter_inactive_days(self, queryset, name, value):
+        """Clientes sin interacciones en los últimos N días"""
+        if value is None:
+            return queryset
 
-        current_month = timezone.now().month
-        return queryset.filter(date_of_birth__month=current_month)
+        # Anti-join NOT EXISTS resuelto con el índice (customer, -interaction_date).
+        # El archivo solo guarda interacciones antiguas, así que no cambia el resultado
+        # mientras N no supere la antigüedad de archivado
+        cutoff = timezone.now() - timedelta(days=int(value))
+        recent = Interaction.objects.filter(customer=OuterRef('pk'), interaction_date__gte=cutoff)
+        return queryset.filter(~Exists(recent))
 
     def filter_by_sales_rep(self, queryset, name, value):
         """Filtrar por nombre del representante de ventas"""
@@ -65,9 +104,167 @@ class CustomerFilter(django_filters.FilterSet):
         )
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class InteractionFilter(django_filters.FilterSet):
+    """Filtros personalizados para interacciones"""
+    date_from = django_filters.DateTimeFilter(field_name='interaction_date', lookup_expr='gte')
+    date_to = django_filters.DateTimeFilter(field_name='interaction_date', lookup_expr='lte')
+
+    class Meta:
+        model = Interaction
+        fields = ['interaction_type', 'customer']
+
+
+class ArchivedInteractionFilter(InteractionFilter):
+    """Mismos filtros que InteractionFilter sobre la tabla de archivo"""
+
+    class Meta:
+        model = ArchivedInteraction
+        fields = ['interaction_type', 'customer']
+
+
+class InteractionRollupFilter(django_filters.FilterSet):
+    """Filtros equivalentes a InteractionFilter sobre la tabla agregada"""
+    date_from = django_filters.DateFilter(field_name='day', lookup_expr='gte')
+    date_to = django_filters.DateFilter(field_name='day', lookup_expr='lte')
+
+    class Meta:
+        model = InteractionDailyRollup
+        fields = ['interaction_type', 'customer']
+
+
+class SparseFieldsetsViewMixin:
+    """
+    Aplica ?fields= / ?omit= también al queryset: limita las columnas con
+    .only() y permite a cada vista omitir los joins y prefetch innecesarios.
+    """
+
+    def get_sparse_fields(self):
+        """Campos seleccionados para el serializer de la acción, o None si son todos"""
+        serializer_class = self.get_serializer_class()
+        if not issubclass(serializer_class, SparseFieldsetsMixin):
+            return None
+        return requested_fields(self.request, serializer_class.Meta.fields)
+
+    def sparse_wants(self, *names):
+        """Indica si alguno de los campos se va a serializar"""
+        selected = self.get_sparse_fields()
+        if selected is None:
+            selected = set(self.get_serializer_class().Meta.fields)
+        return any(name in selected for name in names)
+
+    def apply_sparse_fieldsets(self, queryset):
+        selected = self.get_sparse_fields()
+        if selected is None:
+            return queryset
+        return queryset.only(*self.get_serializer_class().sparse_only(selected))
+
+
+class AtomicViewMixin:
+    """
+    Cada petición del viewset en una transacción: los cambios y su entrada en
+    el registro de cambios (ChangeLogEntry) se confirman juntos. Si la vista
+    falla se deshace todo, aunque DRF convierta la excepción en respuesta.
+    """
+    def dispatch(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().dispatch(request, *args, **kwargs)
+
+    def handle_exception(self, exc):
+        transaction.set_rollback(True)
+        return super().handle_exception(exc)
+
+
+class EndpointLimitsMixin(AtomicViewMixin):
+    """
+    statement_timeouts: {acción: ms} ('default' para el resto de acciones).
+    concurrency_limits: {acción: plazas} para las acciones caras; al
+    agotarse responde 503 con Retry-After (ver api/limits.py). Ambos duran
+    lo que la transacción de la petición.
+    """
+    statement_timeouts = {}
+    concurrency_limits = {}
+
+    def limit_scope(self):
+        return f'{self.basename}.{self.action}'
+
+    def get_statement_timeout(self):
+        return self.statement_timeouts.get(self.action, self.statement_timeouts.get('default'))
+
+    def get_concurrency_limit(self):
+        return self.concurrency_limits.get(self.action)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        slots = self.get_concurrency_limit()
+        if slots and limits.acquire_slot(self.limit_scope(), slots) is None:
+            limits.count('shed', self.limit_scope())
+            raise limits.Overloaded()
+        timeout = self.get_statement_timeout()
+        if timeout:
+            limits.set_statement_timeout(timeout)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, OperationalError) and isinstance(exc.__cause__, QueryCanceled):
+            # Responder 503 en lugar de 500 (AtomicViewMixin deshace la transacción)
+            limits.count('timeouts', self.limit_scope())
+            exc = limits.QueryTimeout()
+        return super().handle_exception(exc)
+
+
+class BatchRetrieveMixin:
+    """
+    ?ids=<id>,<id>,... en el listado: resuelve varios registros con una sola
+    consulta IN usando el mismo queryset que el listado, respeta el orden
+    pedido e indica los ids que no existen.
+    """
+    max_batch_size = 200
+
+    def get_batch_ids(self):
+        ids = []
+        for value in self.request.query_params.getlist('ids'):
+            for raw in value.split(','):
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    object_id = uuid.UUID(raw)
+                except ValueError:
+                    raise ValidationError({'ids': f"Id no válido: {raw}."})
+                if object_id not in ids:
+                    ids.append(object_id)
+
+        if len(ids) > self.max_batch_size:
+            raise ValidationError({'ids': f"Máximo {self.max_batch_size} ids por petición."})
+        return ids
+
+    def list(self, request, *args, **kwargs):
+        if 'ids' not in request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        ids = self.get_batch_ids()
+        found = {obj.pk: obj for obj in self.get_queryset().filter(pk__in=ids)}
+        serializer = self.get_serializer([found[pk] for pk in ids if pk in found], many=True)
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+
+def customer_stats(queryset):
+    """Total y cumpleaños de la semana/mes del queryset en una sola consulta"""
+    return queryset.order_by().aggregate(
+        total_customers=Count('id'),
+        birthday_this_week=Count('id', filter=CustomerFilter.birthday_this_week_q()),
+        birthday_this_month=Count('id', filter=CustomerFilter.birthday_this_month_q()),
+    )
+
+
+class CustomerViewSet(EndpointLimitsMixin, BatchRetrieveMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar clientes con funcionalidades de CRM"""
-    queryset = Customer.objects.select_related('company', 'sales_rep').prefetch_related('interactions')
+    statement_timeouts = {'default': 5000, 'list': 3000, 'stats': 3000}
+    concurrency_limits = {'needs_attention': 4, 'bulk_reassign': 2}
+    queryset = Customer.objects.select_related('company', 'sales_rep', 'interaction_summary')
+    pagination_class = EstimatedCountPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = CustomerFilter
     search_fields = ['first_name', 'last_name', 'email', 'company__name']
@@ -78,46 +275,66 @@ class CustomerViewSet(viewsets.ModelViewSet):
         """Usar diferentes serializers según la acción"""
         if self.action == 'list':
             return CustomerListSerializer
+        elif self.action == 'needs_attention':
+            return CustomerAttentionSerializer
         elif self.action in ['create', 'update', 'partial_update']:
             return CustomerCreateUpdateSerializer
         return CustomerDetailSerializer
 
     def get_queryset(self):
         """Obtener queryset optimizado según la acción"""
-        queryset = Customer.objects.select_related('company', 'sales_rep')
+        queryset = Customer.objects.all()
 
-        if self.action == 'list':
-            # Para la lista, solo prefetch las interacciones más recientes
-            queryset = queryset.prefetch_related(
-                Prefetch(
-                    'interactions',
-                    queryset=Interaction.objects.order_by('-interaction_date'),
-                    to_attr='recent_interactions'
-                )
-            )
-        else:
+        # Solo los joins que necesitan los campos pedidos (?fields= / ?omit=)
+        if self.sparse_wants('company', 'company_name'):
+            queryset = queryset.select_related('company')
+        if self.sparse_wants('sales_rep', 'sales_rep_name'):
+            queryset = queryset.select_related('sales_rep')
+
+        # Última interacción y resumen salen de la tabla precalculada (un join)
+        if self.sparse_wants('last_interaction_info', 'interaction_summary'):
+            queryset = queryset.select_related('interaction_summary')
+        if self.action != 'list' and self.sparse_wants('interactions', 'interaction_count'):
             # Para detalle, incluir todas las interacciones
             queryset = queryset.prefetch_related('interactions')
 
-        return queryset
+        return self.apply_sparse_fieldsets(queryset)
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Estadísticas generales de clientes"""
-        base_queryset = Customer.objects.all()
-        total_customers = base_queryset.count()
-        birthday_this_week = CustomerFilter().filter_birthday_this_week(
-            base_queryset, None, True
-        ).count()
-        birthday_this_month = CustomerFilter().filter_birthday_this_month(
-            base_queryset, None, True
-        ).count()
+        return Response(customer_stats(Customer.objects.all()))
 
-        return Response({
-            'total_customers': total_customers,
-            'birthday_this_week': birthday_this_week,
-            'birthday_this_month': birthday_this_month,
-        })
+    @action(detail=False, methods=['get'], url_path='needs-attention')
+    def needs_attention(self, request):
+        """Clientes sin contacto en los últimos N días (?inactive_days=, 30 por defecto), del más desatendido al menos"""
+        queryset = self.filter_queryset(self.get_queryset())
+        if 'inactive_days' not in request.query_params:
+            queryset = CustomerFilter().filter_inactive_days(queryset, 'inactive_days', 30)
+
+        # Sin ?sales_rep_id= cada representante ve solo su cartera
+        user = request.user
+        if (
+            'sales_rep_id' not in request.query_params and user.is_authenticated
+            and not (user.is_superuser or user.is_admin)
+        ):
+            queryset = queryset.filter(sales_rep=user)
+
+        # Última interacción con el mismo índice; si solo quedan archivadas, la del resumen
+        latest = Interaction.objects.filter(customer=OuterRef('pk')).order_by('-interaction_date')
+        queryset = queryset.annotate(
+            last_interaction_at=Coalesce(
+                Subquery(latest.values('interaction_date')[:1]),
+                F('interaction_summary__last_interaction_at'),
+            )
+        ).order_by(F('last_interaction_at').asc(nulls_first=True), 'id')
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
 
     @action(detail=True, methods=['get'])
     def interactions(self, request, pk=None):
@@ -127,8 +344,29 @@ class CustomerViewSet(viewsets.ModelViewSet):
         serializer = InteractionSerializer(interactions, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], url_path='bulk-reassign')
+    def bulk_reassign(self, request):
+        """Reasignar en bloque los clientes seleccionados por ids y/o filtros"""
+        serializer = CustomerBulkReassignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        queryset = Customer.objects.all()
+        if data.get('ids'):
+            queryset = queryset.filter(pk__in=data['ids'])
+        if data.get('filters'):
+            unknown = set(data['filters']) - set(CustomerFilter.base_filters)
+            if unknown:
+                raise ValidationError({'filters': f"Filtros no válidos: {', '.join(sorted(unknown))}."})
+            filterset = CustomerFilter(data['filters'], queryset=queryset)
+            if not filterset.is_valid():
+                raise ValidationError({'filters': filterset.errors})
+            queryset = filterset.qs
+
+        return Response(reassign_customers(queryset, data['sales_rep']))
 
-class CompanyViewSet(viewsets.ModelViewSet):
+
+class CompanyViewSet(AtomicViewMixin, BatchRetrieveMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar compañías"""
     queryset = Company.objects.prefetch_related('customers')
     serializer_class = CompanySerializer
@@ -137,16 +375,22 @@ class CompanyViewSet(viewsets.ModelViewSet):
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
 
+    def get_queryset(self):
+        queryset = Company.objects.all()
+        if self.sparse_wants('customer_count'):
+            queryset = queryset.prefetch_related('customers')
+        return self.apply_sparse_fieldsets(queryset)
+
     @action(detail=True, methods=['get'])
     def customers(self, request, pk=None):
         """Obtener todos los clientes de una compañía"""
         company = self.get_object()
-        customers = company.customers.select_related('sales_rep').prefetch_related('interactions')
+        customers = company.customers.select_related('sales_rep', 'interaction_summary')
         serializer = CustomerListSerializer(customers, many=True)
         return Response(serializer.data)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(AtomicViewMixin, BatchRetrieveMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar usuarios/representantes de ventas"""
     queryset = User.objects.prefetch_related('customers')
     serializer_class = UserSerializer
@@ -155,30 +399,62 @@ class UserViewSet(viewsets.ModelViewSet):
     ordering_fields = ['username', 'first_name', 'last_name', 'created_at']
     ordering = ['first_name', 'last_name']
 
+    def get_queryset(self):
+        queryset = User.objects.all()
+        if self.sparse_wants('customer_count'):
+            queryset = queryset.prefetch_related('customers')
+        return self.apply_sparse_fieldsets(queryset)
+
     @action(detail=True, methods=['get'])
     def customers(self, request, pk=None):
         """Obtener todos los clientes asignados a un representante"""
         user = self.get_object()
-        customers = user.customers.select_related('company').prefetch_related('interactions')
+        customers = user.customers.select_related('company', 'interaction_summary')
         serializer = CustomerListSerializer(customers, many=True)
         return Response(serializer.data)
 
 
-class InteractionViewSet(viewsets.ModelViewSet):
+class InteractionViewSet(EndpointLimitsMixin, BatchRetrieveMixin, SparseFieldsetsViewMixin, viewsets.ModelViewSet):
     """ViewSet para gestionar interacciones"""
+    statement_timeouts = {'default': 5000, 'list': 3000, 'recent': 3000, 'histogram': 10000}
+    concurrency_limits = {'list': 4, 'recent': 4, 'histogram': 4}
+    # Intervalos soportados por date_trunc para el histograma
+    histogram_intervals = ['hour', 'day', 'week', 'month']
+    # Dimensiones por las que se puede desglosar el histograma
+    histogram_groups = {
+        'interaction_type': 'interaction_type',
+        'customer': 'customer_id',
+        'company': 'customer__company_id',
+        'sales_rep': 'customer__sales_rep_id',
+    }
+
     queryset = Interaction.objects.select_related('customer', 'customer__company')
+    pagination_class = EstimatedCountPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['interaction_type', 'customer']
+    filterset_class = InteractionFilter
     search_fields = ['notes', 'customer__first_name', 'customer__last_name']
     ordering_fields = ['interaction_date', 'interaction_type']
     ordering = ['-interaction_date']
 
+    def get_concurrency_limit(self):
+        # El listado solo es caro con búsqueda de texto (ILIKE sin índice)
+        if self.action == 'list' and not self.request.query_params.get(api_settings.SEARCH_PARAM):
+            return None
+        return super().get_concurrency_limit()
+
     def get_serializer_class(self):
         """Usar diferentes serializers según la acción"""
         if self.action in ['create', 'update', 'partial_update']:
             return InteractionCreateSerializer
         return InteractionSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ['list', 'retrieve', 'recent'] and self.get_sparse_fields() is not None:
+            # InteractionSerializer no lee el cliente: sin join al recortar columnas
+            queryset = self.apply_sparse_fieldsets(queryset.select_related(None))
+        return queryset
+
     @action(detail=False, methods=['get'])
     def recent(self, request):
         """Obtener interacciones recientes (últimos 7 días)"""
@@ -188,3 +464,307 @@ class InteractionViewSet(viewsets.ModelViewSet):
         )
         serializer = self.get_serializer(recent_interactions, many=True)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def histogram(self, request):
+        """Serie temporal de interacciones agrupadas por hora, día, semana o mes"""
+        interval = request.query_params.get('interval', 'day')
+        if interval not in self.histogram_intervals:
+            raise ValidationError({
+                'interval': f"Intervalo no válido. Opciones: {', '.join(self.histogram_intervals)}."
+            })
+
+        group_by = request.query_params.get('group_by')
+        if group_by and group_by not in self.histogram_groups:
+            raise ValidationError({
+                'group_by': f"Agrupación no válida. Opciones: {', '.join(self.histogram_groups)}."
+            })
+
+        source = request.query_params.get('source', 'raw')
+        if source == 'rollup':
+            queryset, count = self._rollup_histogram_queryset(request, interval)
+        elif source == 'raw':
+            # Mismos filtros que el listado, sin el ordenamiento ni los joins del serializer
+            queryset = self.filter_queryset(self.get_queryset()).select_related(None).order_by()
+            queryset = queryset.annotate(bucket=Trunc('interaction_date', interval))
+            count = Count('id')
+        else:
+            raise ValidationError({'source': "Origen no válido. Opciones: raw, rollup."})
+
+        columns = ['bucket']
+        if group_by:
+            queryset = queryset.annotate(group=F(self.histogram_groups[group_by]))
+            columns.append('group')
+
+        buckets = queryset.values(*columns).annotate(count=count).order_by(*columns)
+
+        return Response({
+            'interval': interval,
+            'group_by': group_by,
+            'source': source,
+            'results': list(buckets),
+        })
+
+    def _rollup_histogram_queryset(self, request, interval):
+        """Queryset del histograma leído desde InteractionDailyRollup"""
+        if interval == 'hour':
+            raise ValidationError({'source': "La tabla agregada no tiene granularidad por hora."})
+        if request.query_params.get('search'):
+            raise ValidationError({'source': "La búsqueda por texto requiere source=raw."})
+
+        queryset = InteractionRollupFilter(
+            request.query_params, queryset=InteractionDailyRollup.objects.filter(count__gt=0).order_by()
+        ).qs
+        queryset = queryset.annotate(
+            bucket=Trunc(Cast('day', DateTimeField()), interval)
+        )
+        return queryset, Sum('count')
+
+
+class ArchivedInteractionViewSet(EndpointLimitsMixin, SparseFieldsetsViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Consulta explícita de interacciones archivadas. Los listados y acciones de
+    InteractionViewSet solo leen la tabla principal.
+    """
+    queryset = ArchivedInteraction.objects.all()
+    statement_timeouts = {'default': 5000}
+    concurrency_limits = {'list': 2}
+    pagination_class = EstimatedCountPagination
+    serializer_class = ArchivedInteractionSerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = ArchivedInteractionFilter
+    ordering_fields = ['interaction_date', 'interaction_type']
+    ordering = ['-interaction_date']
+
+    def get_queryset(self):
+        return self.apply_sparse_fieldsets(ArchivedInteraction.objects.all())
+
+
+# Respuesta 410 para un token cuya entrada ya se borró (ver changes.prune)
+TOKEN_EXPIRED = {
+    'detail': "El token es demasiado antiguo: vuelve a descargar los datos y sincroniza con since=latest.",
+    'code': 'resync',
+}
+
+
+class ChangeFeedViewSet(EndpointLimitsMixin, viewsets.ViewSet):
+    """
+    Feed incremental de altas, modificaciones y bajas de clientes, compañías,
+    usuarios e interacciones. ?since=<token> continúa desde la respuesta
+    anterior; ?since=latest solo devuelve el token actual.
+    """
+    statement_timeouts = {'default': 5000}
+
+    def list(self, request):
+        since = request.query_params.get('since')
+        if since == 'latest':
+            return Response({'results': [], 'next_token': changes.head_token(), 'has_more': False})
+
+        models = None
+        if request.query_params.get('models'):
+            models = [name.strip() for name in request.query_params['models'].split(',')]
+            unknown = set(models) - set(changes.TRACKED_MODELS)
+            if unknown:
+                raise ValidationError({'models': f"Modelos no válidos: {', '.join(sorted(unknown))}."})
+
+        try:
+            limit = int(request.query_params.get('limit', changes.MAX_PAGE_SIZE))
+        except ValueError:
+            raise ValidationError({'limit': "Debe ser un número entero."})
+        limit = max(1, min(limit, changes.MAX_PAGE_SIZE))
+
+        try:
+            results, next_token, has_more = changes.changes_since(since, limit, models)
+        except changes.InvalidToken:
+            raise ValidationError({'since': "Token no válido."})
+        except changes.TokenExpired:
+            return Response(TOKEN_EXPIRED, status=status.HTTP_410_GONE)
+
+        return Response({'results': results, 'next_token': next_token, 'has_more': has_more})
+
+    @action(detail=False, methods=['get'], url_path='status')
+    def feed_status(self, request):
+        """Transacción más antigua que retiene el feed y entradas pendientes"""
+        return Response(changes.status())
+
+
+class DashboardViewSet(EndpointLimitsMixin, viewsets.ViewSet):
+    """
+    Datos del dashboard en una sola petición: la página de clientes, las
+    estadísticas generales y los conteos por compañía, representante y
+    cumpleaños. Acepta los mismos parámetros que /api/customers/ y los conteos
+    se calculan sobre el mismo queryset filtrado. La respuesta se cachea por
+    combinación de parámetros durante DASHBOARD_CACHE_TIMEOUT segundos.
+    """
+    facet_limit = 20
+    statement_timeouts = {'default': 5000}
+    concurrency_limits = {'list': 4}
+
+    def get_concurrency_limit(self):
+        # Las respuestas cacheadas no consultan la base de datos
+        if cache.get(self.get_cache_key(self.request)) is not None:
+            return None
+        return super().get_concurrency_limit()
+
+    def list(self, request):
+        cache_key = self.get_cache_key(request)
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.build(request)
+            cache.set(cache_key, data, settings.DASHBOARD_CACHE_TIMEOUT)
+        return Response(data)
+
+    def get_cache_key(self, request):
+        params = urlencode(sorted(
+            (key, value) for key, values in request.query_params.lists() for value in values
+        ))
+        return 'dashboard:' + hashlib.md5(params.encode()).hexdigest()
+
+    def build(self, request):
+        # Mismos filtros, búsqueda, orden y paginación que el listado de clientes
+        customers = CustomerViewSet(request=request, action='list', format_kwarg=None, args=(), kwargs={})
+        queryset = customers.filter_queryset(customers.get_queryset())
+        page = customers.paginate_queryset(queryset)
+        serializer = customers.get_serializer(page, many=True)
+
+        # Los conteos solo necesitan los filtros, sin joins de la página ni orden
+        base = customers.filter_queryset(Customer.objects.all()).order_by()
+        return {
+            'customers': customers.get_paginated_response(serializer.data).data,
+            'stats': customer_stats(Customer.objects.all()),
+            'facets': {
+                'companies': list(
+                    base.values('company_id', 'company__name')
+                    .annotate(count=Count('id'))
+                    .order_by('-count', 'company__name')[:self.facet_limit]
+                ),
+                'sales_reps': list(
+                    base.values(
+                        'sales_rep_id', 'sales_rep__username',
+                        'sales_rep__first_name', 'sales_rep__last_name'
+                    )
+                    .annotate(count=Count('id'))
+                    .order_by('-count', 'sales_rep__username')[:self.facet_limit]
+                ),
+                'birthdays': base.aggregate(
+                    this_week=Count('id', filter=CustomerFilter.birthday_this_week_q()),
+                    this_month=Count('id', filter=CustomerFilter.birthday_this_month_q()),
+                ),
+            },
+        }
+
+
+class AutocompleteViewSet(viewsets.ViewSet):
+    """
+    Sugerencias por prefijo de nombre o email de clientes, compañías y
+    representantes (?q=, ?limit=) desde el índice en memoria del proceso.
+    """
+    default_limit = 10
+    max_limit = 50
+
+    def list(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            raise ValidationError({'limit': "Debe ser un número entero."})
+        limit = max(1, min(limit, self.max_limit))
+
+        index = autocomplete.index
+        if not index.built:
+            # Sin precalentar (p. ej. runserver): construir en segundo plano y responder ya
+            index.start()
+        return Response({
+            'results': index.search(request.query_params.get('q', ''), limit),
+            'truncated': index.truncated,
+            'ready': index.built,
+        })
+
+
+class LimitsViewSet(viewsets.ViewSet):
+    """
+    Configuración de statement_timeout y concurrencia de cada endpoint con
+    los contadores de consultas canceladas y peticiones rechazadas.
+    """
+    def list(self, request):
+        # Importación local: urls importa este módulo
+        from .urls import router
+
+        endpoints = {}
+        for prefix, viewset, basename in router.registry:
+            if not issubclass(viewset, EndpointLimitsMixin):
+                continue
+            actions = (set(viewset.statement_timeouts) | set(viewset.concurrency_limits)) - {'default'}
+            for action_name in sorted(actions) + ['default']:
+                endpoints[f'{basename}.{action_name}'] = {
+                    'statement_timeout_ms': viewset.statement_timeouts.get(
+                        action_name, viewset.statement_timeouts.get('default')
+                    ),
+                    'concurrency_limit': viewset.concurrency_limits.get(action_name),
+                }
+        for scope, values in limits.counters(endpoints).items():
+            endpoints[scope].update(values)
+        return Response({'retry_after': limits.RETRY_AFTER_SECONDS, 'endpoints': endpoints})
+
+
+class JobViewSet(AtomicViewMixin, mixins.CreateModelMixin, mixins.ListModelMixin,
+                 mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Encolar trabajos en segundo plano y consultar su estado y progreso"""
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['status', 'kind']
+    ordering_fields = ['created_at', 'run_after']
+    ordering = ['-created_at']
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """CSV de un trabajo export_customers terminado"""
+        job = self.get_object()
+        path = jobs.export_path(job)
+        if job.kind != 'export_customers' or job.status != Job.Status.SUCCEEDED or not path.exists():
+            return Response(
+                {'detail': "El trabajo no tiene un fichero exportado disponible."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name, content_type='text/csv')
+
+
+async def interaction_stream(request):
+    """
+    Server-Sent Events con las interacciones creadas, modificadas o borradas
+    a medida que se confirman. Reanuda desde Last-Event-ID (o ?since=<token>
+    del feed de cambios) y filtra con ?customer=<id> o ?sales_rep_id=<id>.
+    Solo bajo ASGI (servicio stream): bajo WSGI Django consume el generador
+    completo antes de enviar nada y la conexión ocuparía un worker para siempre.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': "El stream solo está disponible en el servidor ASGI (servicio stream)."},
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    token = request.headers.get('Last-Event-ID') or request.GET.get('since')
+    filters_by = {}
+    try:
+        if token:
+            await sync_to_async(changes.check_token)(token)
+        for param, key in [('customer', 'customer_id'), ('sales_rep_id', 'sales_rep_id')]:
+            if request.GET.get(param):
+                filters_by[key] = uuid.UUID(request.GET[param])
+    except changes.InvalidToken:
+        return JsonResponse({'since': ["Token no válido."]}, status=status.HTTP_400_BAD_REQUEST)
+    except changes.TokenExpired:
+        return JsonResponse(TOKEN_EXPIRED, status=status.HTTP_410_GONE)
+    except ValueError:
+        return JsonResponse({'detail': "Id no válido."}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not token:
+        # Sin posición previa solo se envían los cambios a partir de ahora
+        token = await sync_to_async(changes.head_token)()
+
+    response = StreamingHttpResponse(
+        stream.interaction_events(token, **filters_by), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
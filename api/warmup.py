@@ -0,0 +1,109 @@
+"""
+Precalentamiento de la aplicación antes de atender tráfico.
+
+warm_code() resuelve las URLs, construye los campos de los serializers y los
+formularios de los filtersets y atiende una petición a la raíz de la API sin
+tocar la base de datos; con preload_app se ejecuta una sola vez en el master
+de gunicorn y los workers heredan el resultado al hacer fork.
+warm_connections() abre la conexión a PostgreSQL de cada worker y ejecuta una
+consulta mínima por modelo. warm_index() arranca el hilo de sincronización
+del índice de autocompletado, que lo construye, y espera un tiempo acotado a
+que termine. Todas retornan los tiempos de cada paso en ms.
+"""
+import inspect
+import logging
+import time
+
+import django_filters
+from django.conf import settings
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import get_resolver, resolve, reverse
+from rest_framework import serializers as drf_serializers
+
+from . import autocomplete, serializers, views
+from .models import Company, Customer, Interaction, User
+from .urls import router
+
+logger = logging.getLogger(__name__)
+
+
+def _timed(timings, name, func):
+    """Ejecuta un paso y anota su duración; un fallo no impide arrancar"""
+    start = time.perf_counter()
+    try:
+        func()
+    except Exception:
+        logger.exception('Fallo al precalentar %s', name)
+    timings[name] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def _classes(module, base):
+    """Clases definidas en el módulo que heredan de base"""
+    return [
+        value for value in vars(module).values()
+        if inspect.isclass(value) and issubclass(value, base) and value.__module__ == module.__name__
+    ]
+
+
+def prime_urls():
+    get_resolver().url_patterns
+    for prefix, viewset, basename in router.registry:
+        resolve(reverse(f'{basename}-list'))
+
+
+def prime_serializers():
+    for serializer_class in _classes(serializers, drf_serializers.BaseSerializer):
+        serializer_class().fields
+
+
+def prime_filtersets():
+    for filterset_class in _classes(views, django_filters.FilterSet):
+        filterset_class(data={}, queryset=filterset_class._meta.model.objects.none()).form
+
+
+def prime_request():
+    """Una petición a la raíz de la API: vistas, negociación y renderizado de DRF"""
+    host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+    request = RequestFactory().get('/api/', HTTP_ACCEPT='application/json', HTTP_HOST=host)
+    request.resolver_match = resolve('/api/')
+    response = request.resolver_match.func(request)
+    response.render()
+
+
+def warm_code():
+    timings = {}
+    _timed(timings, 'urls', prime_urls)
+    _timed(timings, 'serializers', prime_serializers)
+    _timed(timings, 'filtersets', prime_filtersets)
+    _timed(timings, 'request', prime_request)
+    # Ninguna conexión abierta en el master debe heredarse en los workers
+    connections.close_all()
+    logger.info('Aplicación precalentada (ms): %s', timings)
+    return timings
+
+
+def prime_connections():
+    for alias in connections:
+        connections[alias].ensure_connection()
+    for model in (User, Company, Customer, Interaction):
+        model.objects.exists()
+
+
+def warm_connections():
+    timings = {}
+    _timed(timings, 'connections', prime_connections)
+    return timings
+
+
+def warm_index(wait_seconds=10):
+    """
+    La construcción puede tardar más que el timeout de gunicorn con muchos
+    clientes: se hace en el hilo y solo se espera wait_seconds. Si no termina,
+    el worker atiende igualmente y el índice aparece al completarse.
+    """
+    timings = {}
+    autocomplete.index.start()
+    _timed(timings, 'autocomplete', lambda: autocomplete.index.ready.wait(wait_seconds))
+    timings['autocomplete_ready'] = autocomplete.index.built
+    return timings
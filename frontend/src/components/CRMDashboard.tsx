@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Search, Filter, Calendar, Building, User, Phone, Mail, MessageSquare } from 'lucide-react';
-import { Customer, CustomerFilters, CustomerStats } from '../types';
+import { Customer, CustomerFilters, CustomerStats, DashboardResponse } from '../types';
 import { customerService } from '../lib/api';
 import { Card, CardContent, CardHeader, CardTitle } from './ui/card';
 import { Input } from './ui/input';
@@ -16,35 +16,30 @@ const CRMDashboard: React.FC = () => {
     page: 1
   });
   const [totalCount, setTotalCount] = useState(0);
+  const [countIsEstimate, setCountIsEstimate] = useState(false);
+  const [facets, setFacets] = useState<DashboardResponse['facets'] | null>(null);
 
-  // Cargar datos iniciales
+  // Cargar página, estadísticas y facetas en una sola petición
   useEffect(() => {
-    loadCustomers();
-    loadStats();
+    loadDashboard();
   }, [filters]);
 
-  const loadCustomers = async () => {
+  const loadDashboard = async () => {
     try {
       setLoading(true);
-      const response = await customerService.getCustomers(filters);
-      setCustomers(response.results);
-      setTotalCount(response.count);
+      const response = await customerService.getDashboard(filters);
+      setCustomers(response.customers.results);
+      setTotalCount(response.customers.count);
+      setCountIsEstimate(Boolean(response.customers.count_is_estimate));
+      setStats(response.stats);
+      setFacets(response.facets);
     } catch (error) {
-      console.error('Error loading customers:', error);
+      console.error('Error loading dashboard:', error);
     } finally {
       setLoading(false);
     }
   };
 
-  const loadStats = async () => {
-    try {
-      const statsData = await customerService.getCustomerStats();
-      setStats(statsData);
-    } catch (error) {
-      console.error('Error loading stats:', error);
-    }
-  };
-
   const handleSearchChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     setFilters(prev => ({
       ...prev,
@@ -91,7 +86,7 @@ const CRMDashboard: React.FC = () => {
       <div className="flex justify-between items-center">
         <h1 className="text-3xl font-bold">CRM Dashboard</h1>
         <div className="text-sm text-muted-foreground">
-          Total de clientes: {totalCount.toLocaleString()}
+          Total de clientes: {countIsEstimate ? 'aprox. ' : ''}{totalCount.toLocaleString()}
         </div>
       </div>
 
@@ -176,6 +171,78 @@ const CRMDashboard: React.FC = () => {
         </CardContent>
       </Card>
 
+      {/* Conteos por faceta sobre los filtros actuales */}
+      {facets && (
+        <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+          <Card>
+            <CardHeader>
+              <CardTitle className="text-sm font-medium">Por compañía</CardTitle>
+            </CardHeader>
+            <CardContent className="space-y-1">
+              {facets.companies.map((facet) => (
+                <button
+                  key={facet.company_id}
+                  className="flex w-full justify-between text-sm hover:underline"
+                  onClick={() => handleFilterChange('company', facet.company__name)}
+                >
+                  <span>{facet.company__name}</span>
+                  <span className="text-muted-foreground">{facet.count.toLocaleString()}</span>
+                </button>
+              ))}
+            </CardContent>
+          </Card>
+
+          <Card>
+            <CardHeader>
+              <CardTitle className="text-sm font-medium">Por representante</CardTitle>
+            </CardHeader>
+            <CardContent className="space-y-1">
+              {facets.sales_reps.map((facet) =>
+                facet.sales_rep_id ? (
+                  <button
+                    key={facet.sales_rep_id}
+                    className="flex w-full justify-between text-sm hover:underline"
+                    onClick={() => handleFilterChange('sales_rep_id', facet.sales_rep_id)}
+                  >
+                    <span>
+                      {`${facet.sales_rep__first_name ?? ''} ${facet.sales_rep__last_name ?? ''}`.trim() || facet.sales_rep__username}
+                    </span>
+                    <span className="text-muted-foreground">{facet.count.toLocaleString()}</span>
+                  </button>
+                ) : (
+                  <div key="sin-asignar" className="flex justify-between text-sm">
+                    <span className="text-muted-foreground">Sin asignar</span>
+                    <span className="text-muted-foreground">{facet.count.toLocaleString()}</span>
+                  </div>
+                )
+              )}
+            </CardContent>
+          </Card>
+
+          <Card>
+            <CardHeader>
+              <CardTitle className="text-sm font-medium">Cumpleaños</CardTitle>
+            </CardHeader>
+            <CardContent className="space-y-1">
+              <button
+                className="flex w-full justify-between text-sm hover:underline"
+                onClick={() => handleFilterChange('birthday_this_week', true)}
+              >
+                <span>Esta semana</span>
+                <span className="text-muted-foreground">{facets.birthdays.this_week.toLocaleString()}</span>
+              </button>
+              <button
+                className="flex w-full justify-between text-sm hover:underline"
+                onClick={() => handleFilterChange('birthday_this_month', true)}
+              >
+                <span>Este mes</span>
+                <span className="text-muted-foreground">{facets.birthdays.this_month.toLocaleString()}</span>
+              </button>
+            </CardContent>
+          </Card>
+        </div>
+      )}
+
       {/* Tabla de clientes */}
       <Card>
         <CardHeader>
@@ -0,0 +1,51 @@
+import axios from 'axios';
+import {
+  ApiResponse,
+  AutocompleteResponse,
+  Customer,
+  CustomerDetail,
+  CustomerFilters,
+  CustomerStats,
+  DashboardResponse,
+} from '../types';
+
+const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
+
+export const api = axios.create({
+  baseURL: API_URL,
+  withCredentials: true,
+});
+
+// Elimina los filtros vacíos o desactivados para no enviarlos como parámetros
+const toParams = (filters: CustomerFilters) =>
+  Object.fromEntries(
+    Object.entries(filters).filter(([, value]) => value !== undefined && value !== '' && value !== false)
+  );
+
+export const customerService = {
+  async getCustomers(filters: CustomerFilters = {}): Promise<ApiResponse<Customer>> {
+    const { data } = await api.get<ApiResponse<Customer>>('/customers/', { params: toParams(filters) });
+    return data;
+  },
+
+  async getCustomer(id: string): Promise<CustomerDetail> {
+    const { data } = await api.get<CustomerDetail>(`/customers/${id}/`);
+    return data;
+  },
+
+  async getCustomerStats(): Promise<CustomerStats> {
+    const { data } = await api.get<CustomerStats>('/customers/stats/');
+    return data;
+  },
+
+  // Página de clientes, estadísticas y conteos por faceta en una sola petición
+  async getDashboard(filters: CustomerFilters = {}): Promise<DashboardResponse> {
+    const { data } = await api.get<DashboardResponse>('/dashboard/', { params: toParams(filters) });
+    return data;
+  },
+
+  async autocomplete(q: string, limit?: number): Promise<AutocompleteResponse> {
+    const { data } = await api.get<AutocompleteResponse>('/autocomplete/', { params: { q, limit } });
+    return data;
+  },
+};
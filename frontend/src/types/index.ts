@@ -24,6 +24,7 @@ export interface Customer {
   company_name: string;
   sales_rep_name: string | null;
   last_interaction_info: LastInteractionInfo | null;
+  interaction_summary: InteractionSummary | null;
   date_of_birth: string;
   created_at: string;
 }
@@ -52,6 +53,18 @@ export interface LastInteractionInfo {
   date: string;
 }
 
+// Resumen precalculado de interacciones (incluye las archivadas)
+export interface InteractionSummary {
+  total: number;
+  counts: Partial<Record<InteractionType, number>>;
+  last_by_type: Partial<Record<InteractionType, string>>;
+  first_interaction_at: string | null;
+  last_interaction_at: string | null;
+  last_interaction_type: InteractionType | '';
+  // { 'YYYY-MM-DD': n } de los últimos 30 días
+  recent_activity: Record<string, number>;
+}
+
 // Tipos de interacción
 export type InteractionType =
   | 'Call'
@@ -69,6 +82,7 @@ export interface CustomerFilters {
   name?: string;
   company?: string;
   sales_rep?: string;
+  sales_rep_id?: string;
   birthday_this_week?: boolean;
   birthday_this_month?: boolean;
   ordering?: string;
@@ -78,6 +92,8 @@ export interface CustomerFilters {
 // Tipos para respuestas de la API
 export interface ApiResponse<T> {
   count: number;
+  // true cuando count es una estimación de PostgreSQL (listados muy grandes)
+  count_is_estimate?: boolean;
   next: string | null;
   previous: string | null;
   results: T[];
@@ -89,6 +105,45 @@ export interface CustomerStats {
   birthday_this_month: number;
 }
 
+// Respuesta de /api/dashboard/: página, estadísticas y conteos por faceta
+export interface FacetCount {
+  count: number;
+}
+
+export interface CompanyFacet extends FacetCount {
+  company_id: string;
+  company__name: string;
+}
+
+export interface SalesRepFacet extends FacetCount {
+  sales_rep_id: string | null;
+  sales_rep__username: string | null;
+  sales_rep__first_name: string | null;
+  sales_rep__last_name: string | null;
+}
+
+export interface DashboardResponse {
+  customers: ApiResponse<Customer>;
+  stats: CustomerStats;
+  facets: {
+    companies: CompanyFacet[];
+    sales_reps: SalesRepFacet[];
+    birthdays: { this_week: number; this_month: number };
+  };
+}
+
+export interface AutocompleteResult {
+  type: 'customer' | 'company' | 'user';
+  id: string;
+  label: string;
+  detail: string;
+}
+
+export interface AutocompleteResponse {
+  results: AutocompleteResult[];
+  truncated: boolean;
+}
+
 // Tipos para formularios
 export interface CustomerFormData {
   first_name: string;
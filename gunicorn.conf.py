@@ -0,0 +1,23 @@
+"""
+Configuración de gunicorn.
+
+preload_app importa y precalienta la aplicación una sola vez en el master
+(testingpython.wsgi.create_application); cada worker hereda ese estado al
+hacer fork y, en post_worker_init, antes de aceptar peticiones, abre su
+propia conexión a PostgreSQL y arranca la construcción de su índice de
+autocompletado, esperándola como mucho un tercio del timeout.
+"""
+import os
+
+wsgi_app = 'testingpython.wsgi:create_application()'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 3))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+preload_app = True
+
+
+def post_worker_init(worker):
+    from api import warmup
+
+    timings = {**warmup.warm_connections(), **warmup.warm_index(wait_seconds=worker.cfg.timeout / 3)}
+    worker.log.info('Worker %s precalentado: %s', worker.pid, timings)
@@ -91,6 +91,11 @@ DATABASES = {
         'PASSWORD': env('DB_PASSWORD', default='postgres'),
         'HOST': env('DB_HOST', default='localhost'),
         'PORT': env('DB_PORT', default='5432'),
+        'OPTIONS': {
+            # Una transacción olvidada abierta detiene el feed de cambios (ver
+            # api/changes.py): PostgreSQL la corta tras estos milisegundos
+            'options': f"-c idle_in_transaction_session_timeout={env.int('DB_IDLE_IN_TRANSACTION_TIMEOUT', default=60000)}",
+        },
     }
 }
 
@@ -149,6 +154,35 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Por encima de este número de filas (estimado) los listados paginados
+# devuelven el conteo estimado por PostgreSQL en lugar de un COUNT(*) exacto
+EXACT_COUNT_THRESHOLD = env.int('EXACT_COUNT_THRESHOLD', default=10000)
+
+# Caché (LocMem por defecto; en producción p. ej. CACHE_URL=redis://redis:6379/1)
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Segundos que se reutiliza la respuesta de /api/dashboard/ para los mismos filtros
+DASHBOARD_CACHE_TIMEOUT = env.int('DASHBOARD_CACHE_TIMEOUT', default=30)
+
+# Días que se conservan las entradas del feed de cambios (trabajo prune_changes);
+# un cliente con un token más antiguo recibe 410 y debe resincronizar
+CHANGELOG_RETENTION_DAYS = env.int('CHANGELOG_RETENTION_DAYS', default=30)
+
+# Índice de autocompletado en memoria (ver api/autocomplete.py): términos
+# máximos por proceso y segundos entre lecturas del feed de cambios
+AUTOCOMPLETE_MAX_ENTRIES = env.int('AUTOCOMPLETE_MAX_ENTRIES', default=500000)
+AUTOCOMPLETE_SYNC_SECONDS = env.int('AUTOCOMPLETE_SYNC_SECONDS', default=5)
+
+# Snapshots de los datasets de tests y benchmarks (ver api/datasets.py)
+DATASET_SNAPSHOT_DIR = env.str('DATASET_SNAPSHOT_DIR', default=str(BASE_DIR / 'snapshots'))
+
+# Trabajos encolados desde /api/jobs/: antigüedad mínima en días de lo que se
+# puede archivar y directorio de los ficheros exportados
+ARCHIVE_MIN_AGE_DAYS = env.int('ARCHIVE_MIN_AGE_DAYS', default=90)
+EXPORT_DIR = env.str('EXPORT_DIR', default=str(MEDIA_ROOT / 'exports'))
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # Solo para desarrollo
 CORS_ALLOW_CREDENTIALS = True
@@ -1,7 +1,9 @@
 """
 WSGI config for testingpython project.
 
-It exposes the WSGI callable as a module-level variable named ``application``.
+It exposes the WSGI callable as a module-level variable named ``application``
+and a ``create_application()`` factory that also warms the app up (used by
+gunicorn.conf.py together with ``preload_app``).
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
@@ -14,3 +16,14 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'testingpython.settings')
 
 application = get_wsgi_application()
+
+
+def create_application():
+    """
+    Fábrica para gunicorn: con preload_app se ejecuta una vez en el master,
+    que importa y precalienta la aplicación antes de crear los workers.
+    """
+    from api import warmup
+
+    warmup.warm_code()
+    return application